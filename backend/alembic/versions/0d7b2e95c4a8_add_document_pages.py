@@ -0,0 +1,99 @@
+"""add_document_pages
+
+Revision ID: 0d7b2e95c4a8
+Revises: c8e1f47a2b03
+Create Date: 2026-10-18 16:47:30.512884
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0d7b2e95c4a8'
+down_revision: Union[str, Sequence[str], None] = 'c8e1f47a2b03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 200
+# pdfminer's extract_text ends every page with a form feed.
+PAGE_SEPARATOR = '\f'
+
+documents = sa.table(
+    'documents',
+    sa.column('id', sa.Integer()),
+    sa.column('content', sa.Text()),
+)
+document_pages = sa.table(
+    'document_pages',
+    sa.column('document_id', sa.Integer()),
+    sa.column('page_number', sa.Integer()),
+    sa.column('char_start', sa.Integer()),
+    sa.column('char_end', sa.Integer()),
+    sa.column('text', sa.Text()),
+)
+
+
+def _page_rows(doc_id, content):
+    page_texts = content.split(PAGE_SEPARATOR)
+    if len(page_texts) > 1 and not page_texts[-1].strip():
+        page_texts.pop()
+
+    rows, start = [], 0
+    for number, text in enumerate(page_texts, start=1):
+        rows.append({
+            'document_id': doc_id,
+            'page_number': number,
+            'char_start': start,
+            'char_end': start + len(text),
+            'text': text,
+        })
+        start += len(text) + len(PAGE_SEPARATOR)
+    return rows
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('document_pages',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('document_id', sa.Integer(), nullable=False),
+    sa.Column('page_number', sa.Integer(), nullable=False),
+    sa.Column('char_start', sa.Integer(), nullable=False),
+    sa.Column('char_end', sa.Integer(), nullable=False),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('document_id', 'page_number')
+    )
+    op.add_column('claims', sa.Column('page_number', sa.Integer(), nullable=True))
+
+    # Split existing documents into pages so they are searchable and
+    # citable like new uploads, in id-ordered batches.
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(documents.c.id, documents.c.content)
+            .where(documents.c.id > last_id)
+            .order_by(documents.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        pages = [
+            page
+            for doc_id, content in rows
+            if content
+            for page in _page_rows(doc_id, content)
+        ]
+        if pages:
+            bind.execute(document_pages.insert(), pages)
+        last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('claims', 'page_number')
+    op.drop_table('document_pages')
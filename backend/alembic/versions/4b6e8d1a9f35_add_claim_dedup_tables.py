@@ -0,0 +1,65 @@
+"""add_claim_dedup_tables
+
+Revision ID: 4b6e8d1a9f35
+Revises: e93b6d20f1c7
+Create Date: 2026-10-18 18:34:50.771256
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b6e8d1a9f35'
+down_revision: Union[str, Sequence[str], None] = 'e93b6d20f1c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('claim_minhashes',
+    sa.Column('claim_id', sa.Integer(), nullable=False),
+    sa.Column('scope_id', sa.Integer(), nullable=False),
+    sa.Column('signature', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['claim_id'], ['claims.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('claim_id')
+    )
+    op.create_table('claim_lsh_buckets',
+    sa.Column('scope_id', sa.Integer(), nullable=False),
+    sa.Column('band', sa.SmallInteger(), nullable=False),
+    sa.Column('bucket', sa.BigInteger(), nullable=False),
+    sa.Column('claim_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['claim_id'], ['claims.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('scope_id', 'band', 'bucket', 'claim_id')
+    )
+    op.create_index('ix_claim_lsh_buckets_claim_id', 'claim_lsh_buckets', ['claim_id'], unique=False)
+    op.create_table('claim_provenance',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('claim_id', sa.Integer(), nullable=False),
+    sa.Column('document_id', sa.Integer(), nullable=False),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.Column('confidence', sa.Float(), nullable=False),
+    sa.Column('span_start', sa.Integer(), nullable=True),
+    sa.Column('span_end', sa.Integer(), nullable=True),
+    sa.Column('page_number', sa.Integer(), nullable=True),
+    sa.Column('similarity', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['claim_id'], ['claims.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_claim_provenance_claim_id', 'claim_provenance', ['claim_id'], unique=False)
+    op.create_index('ix_claim_provenance_document_id', 'claim_provenance', ['document_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_claim_provenance_document_id', table_name='claim_provenance')
+    op.drop_index('ix_claim_provenance_claim_id', table_name='claim_provenance')
+    op.drop_table('claim_provenance')
+    op.drop_index('ix_claim_lsh_buckets_claim_id', table_name='claim_lsh_buckets')
+    op.drop_table('claim_lsh_buckets')
+    op.drop_table('claim_minhashes')
@@ -0,0 +1,38 @@
+"""add_option_scores
+
+Revision ID: 5f0d3a8c71e2
+Revises: e4a8f2c6b913
+Create Date: 2026-10-18 15:02:41.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f0d3a8c71e2'
+down_revision: Union[str, Sequence[str], None] = 'e4a8f2c6b913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('option_scores',
+    sa.Column('option_id', sa.Integer(), nullable=False),
+    sa.Column('decision_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['decision_id'], ['decisions.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['option_id'], ['decision_options.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('option_id')
+    )
+    op.create_index('ix_option_scores_decision_score', 'option_scores', ['decision_id', 'score'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_option_scores_decision_score', table_name='option_scores')
+    op.drop_table('option_scores')
@@ -0,0 +1,47 @@
+"""add_gemini_usage
+
+Revision ID: 6e2f8b4c0a57
+Revises: 9c5a1e7d3b28
+Create Date: 2026-10-18 20:05:42.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e2f8b4c0a57'
+down_revision: Union[str, Sequence[str], None] = '9c5a1e7d3b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('gemini_usage',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('decision_id', sa.Integer(), nullable=True),
+    sa.Column('endpoint', sa.String(length=64), nullable=False),
+    sa.Column('purpose', sa.String(length=32), nullable=False),
+    sa.Column('model', sa.String(length=100), nullable=False),
+    sa.Column('estimated_tokens', sa.Integer(), nullable=False),
+    sa.Column('prompt_tokens', sa.Integer(), nullable=True),
+    sa.Column('output_tokens', sa.Integer(), nullable=True),
+    sa.Column('total_tokens', sa.Integer(), nullable=True),
+    sa.Column('latency_ms', sa.Float(), nullable=False),
+    sa.Column('error', sa.String(length=100), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['decision_id'], ['decisions.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_gemini_usage_decision_created', 'gemini_usage', ['decision_id', 'created_at'], unique=False)
+    op.create_index('ix_gemini_usage_endpoint_created', 'gemini_usage', ['endpoint', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_gemini_usage_endpoint_created', table_name='gemini_usage')
+    op.drop_index('ix_gemini_usage_decision_created', table_name='gemini_usage')
+    op.drop_table('gemini_usage')
@@ -0,0 +1,109 @@
+"""move_document_bodies
+
+Revision ID: 7a3f9c1d5e62
+Revises: 0d7b2e95c4a8
+Create Date: 2026-10-18 17:21:04.338920
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import zstandard
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a3f9c1d5e62'
+down_revision: Union[str, Sequence[str], None] = '0d7b2e95c4a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 200
+
+documents = sa.table(
+    'documents',
+    sa.column('id', sa.Integer()),
+    sa.column('content', sa.Text()),
+)
+document_bodies = sa.table(
+    'document_bodies',
+    sa.column('document_id', sa.Integer()),
+    sa.column('codec', sa.String()),
+    sa.column('char_count', sa.Integer()),
+    sa.column('sha256', sa.String()),
+    sa.column('data', sa.LargeBinary()),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('document_bodies',
+    sa.Column('document_id', sa.Integer(), nullable=False),
+    sa.Column('codec', sa.String(length=16), nullable=False),
+    sa.Column('char_count', sa.Integer(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('document_id')
+    )
+
+    # Copy bodies over in id-ordered batches so no step holds every
+    # document in memory.
+    bind = op.get_bind()
+    compressor = zstandard.ZstdCompressor(level=10)
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(documents.c.id, documents.c.content)
+            .where(documents.c.id > last_id)
+            .order_by(documents.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            document_bodies.insert(),
+            [
+                {
+                    'document_id': doc_id,
+                    'codec': 'zstd',
+                    'char_count': len(content),
+                    'sha256': hashlib.sha256(content.encode()).hexdigest(),
+                    'data': compressor.compress(content.encode()),
+                }
+                for doc_id, content in rows
+            ],
+        )
+        last_id = rows[-1][0]
+
+    op.drop_column('documents', 'content')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('documents', sa.Column('content', sa.Text(), nullable=True))
+
+    bind = op.get_bind()
+    decompressor = zstandard.ZstdDecompressor()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(document_bodies.c.document_id, document_bodies.c.data)
+            .where(document_bodies.c.document_id > last_id)
+            .order_by(document_bodies.c.document_id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for doc_id, data in rows:
+            bind.execute(
+                documents.update()
+                .where(documents.c.id == doc_id)
+                .values(content=decompressor.decompress(data).decode())
+            )
+        last_id = rows[-1][0]
+
+    op.execute("UPDATE documents SET content = '' WHERE content IS NULL")
+    op.alter_column('documents', 'content', nullable=False)
+    op.drop_table('document_bodies')
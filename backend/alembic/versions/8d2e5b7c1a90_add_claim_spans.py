@@ -0,0 +1,30 @@
+"""add_claim_spans
+
+Revision ID: 8d2e5b7c1a90
+Revises: 3c1f7a9e2b4d
+Create Date: 2026-10-18 10:03:17.552108
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2e5b7c1a90'
+down_revision: Union[str, Sequence[str], None] = '3c1f7a9e2b4d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('claims', sa.Column('span_start', sa.Integer(), nullable=True))
+    op.add_column('claims', sa.Column('span_end', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('claims', 'span_end')
+    op.drop_column('claims', 'span_start')
@@ -0,0 +1,38 @@
+"""add_option_linking
+
+Revision ID: 9c5a1e7d3b28
+Revises: 4b6e8d1a9f35
+Create Date: 2026-10-18 19:21:08.413967
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c5a1e7d3b28'
+down_revision: Union[str, Sequence[str], None] = '4b6e8d1a9f35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('decision_options', sa.Column('description', sa.Text(), nullable=True))
+    op.create_table('option_claim_checks',
+    sa.Column('option_id', sa.Integer(), nullable=False),
+    sa.Column('claim_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['claim_id'], ['claims.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['option_id'], ['decision_options.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('option_id', 'claim_id')
+    )
+    op.create_index('ix_option_claim_checks_claim', 'option_claim_checks', ['claim_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_option_claim_checks_claim', table_name='option_claim_checks')
+    op.drop_table('option_claim_checks')
+    op.drop_column('decision_options', 'description')
@@ -0,0 +1,39 @@
+"""add_claim_graph_indexes
+
+Revision ID: a2c94e7b5d16
+Revises: 5f0d3a8c71e2
+Create Date: 2026-10-18 15:40:12.604117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2c94e7b5d16'
+down_revision: Union[str, Sequence[str], None] = '5f0d3a8c71e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_documents_decision_id', 'documents', ['decision_id'], unique=False)
+    op.create_index('ix_claims_document_span', 'claims', ['document_id', 'span_start', 'id'], unique=False)
+    op.create_index('ix_claim_relations_from', 'claim_relations', ['from_claim_id'], unique=False, postgresql_include=['to_claim_id', 'relation_type', 'strength'])
+    op.create_index('ix_claim_relations_to', 'claim_relations', ['to_claim_id', 'from_claim_id'], unique=False)
+    op.create_index('ix_decision_options_decision_id', 'decision_options', ['decision_id', 'id'], unique=False)
+    op.create_index('ix_decision_claim_links_option', 'decision_claim_links', ['option_id', 'id'], unique=False, postgresql_include=['claim_id', 'effect', 'weight'])
+    op.create_index('ix_decision_claim_links_claim', 'decision_claim_links', ['claim_id', 'option_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_decision_claim_links_claim', table_name='decision_claim_links')
+    op.drop_index('ix_decision_claim_links_option', table_name='decision_claim_links')
+    op.drop_index('ix_decision_options_decision_id', table_name='decision_options')
+    op.drop_index('ix_claim_relations_to', table_name='claim_relations')
+    op.drop_index('ix_claim_relations_from', table_name='claim_relations')
+    op.drop_index('ix_claims_document_span', table_name='claims')
+    op.drop_index('ix_documents_decision_id', table_name='documents')
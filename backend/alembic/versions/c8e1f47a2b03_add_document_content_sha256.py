@@ -0,0 +1,30 @@
+"""add_document_content_sha256
+
+Revision ID: c8e1f47a2b03
+Revises: a2c94e7b5d16
+Create Date: 2026-10-18 16:12:55.290431
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e1f47a2b03'
+down_revision: Union[str, Sequence[str], None] = 'a2c94e7b5d16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('content_sha256', sa.String(length=64), nullable=True))
+    op.create_index('ix_documents_content_sha256', 'documents', ['content_sha256'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_documents_content_sha256', table_name='documents')
+    op.drop_column('documents', 'content_sha256')
@@ -0,0 +1,43 @@
+"""add_consultant_reports
+
+Revision ID: e4a8f2c6b913
+Revises: b71c04e9d3f2
+Create Date: 2026-10-18 13:48:09.771402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a8f2c6b913'
+down_revision: Union[str, Sequence[str], None] = 'b71c04e9d3f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('consultant_reports',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('decision_id', sa.Integer(), nullable=False),
+    sa.Column('option_id', sa.Integer(), nullable=False),
+    sa.Column('fingerprint', sa.String(length=64), nullable=False),
+    sa.Column('model', sa.String(length=100), nullable=False),
+    sa.Column('prompt_version', sa.String(length=32), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['decision_id'], ['decisions.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['option_id'], ['decision_options.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('decision_id', 'fingerprint')
+    )
+    op.create_index('ix_consultant_reports_decision_created', 'consultant_reports', ['decision_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_consultant_reports_decision_created', table_name='consultant_reports')
+    op.drop_table('consultant_reports')
@@ -0,0 +1,35 @@
+"""add_search_vectors
+
+Revision ID: e93b6d20f1c7
+Revises: 7a3f9c1d5e62
+Create Date: 2026-10-18 17:58:26.047713
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e93b6d20f1c7'
+down_revision: Union[str, Sequence[str], None] = '7a3f9c1d5e62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('claims', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("setweight(to_tsvector('english', text), 'A') || setweight(to_tsvector('english', coalesce(normalized_text, '')), 'B')", persisted=True), nullable=True))
+    op.create_index('ix_claims_search_vector', 'claims', ['search_vector'], unique=False, postgresql_using='gin')
+    op.add_column('document_pages', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("to_tsvector('english', text)", persisted=True), nullable=True))
+    op.create_index('ix_document_pages_search_vector', 'document_pages', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_document_pages_search_vector', table_name='document_pages', postgresql_using='gin')
+    op.drop_column('document_pages', 'search_vector')
+    op.drop_index('ix_claims_search_vector', table_name='claims', postgresql_using='gin')
+    op.drop_column('claims', 'search_vector')
@@ -0,0 +1,98 @@
+from bisect import insort
+from dataclasses import dataclass
+
+# Preferred cut points, strongest first: page break (pdfminer emits \f at
+# the end of every page), blank line, line break, any whitespace.
+BOUNDARIES = ("\f", "\n\n", "\n", " ")
+
+
+@dataclass
+class Chunk:
+    start: int
+    end: int
+    text: str
+
+
+def _cut_point(text: str, start: int, end: int) -> int:
+    # Never cut in the first half of the window, or chunks get tiny.
+    floor = start + (end - start) // 2
+    for boundary in BOUNDARIES:
+        found = text.rfind(boundary, floor, end)
+        if found != -1:
+            return found + len(boundary)
+    return end
+
+
+def split_into_chunks(text: str, max_chars: int, overlap_chars: int) -> list[Chunk]:
+    """Split ``text`` on page/paragraph boundaries into overlapping chunks.
+
+    Every chunk keeps its start/end offset in ``text`` so spans found inside
+    a chunk can be mapped back to the whole document.
+    """
+    if len(text) <= max_chars:
+        return [Chunk(0, len(text), text)]
+
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(len(text), start + max_chars)
+        if end < len(text):
+            end = _cut_point(text, start, end)
+
+        chunks.append(Chunk(start, end, text[start:end]))
+        if end == len(text):
+            break
+
+        # Step back by the overlap, then forward to the next word so the
+        # next chunk does not open mid-word.
+        next_start = max(start + 1, end - overlap_chars)
+        space = text.find(" ", next_start, end)
+        start = space + 1 if space != -1 else next_start
+
+    return chunks
+
+
+def _overlap(a_start: int, a_end: int, b_start: int, b_end: int) -> float:
+    shorter = min(a_end - a_start, b_end - b_start)
+    if shorter <= 0:
+        return 0.0
+    return max(0, min(a_end, b_end) - max(a_start, b_start)) / shorter
+
+
+def dedupe_spans(items: list, key, span, confidence, min_overlap: float = 0.8):
+    """Drop items extracted twice from the overlap between two chunks.
+
+    Two items are the same claim when their spans overlap by at least
+    ``min_overlap`` of the shorter one, or when their keys match and the
+    spans touch at all. The higher-confidence copy wins.
+    """
+    ordered = sorted(items, key=lambda item: (span(item)[0], -confidence(item)))
+    kept = []
+    longest = 0
+
+    for item in ordered:
+        start, end = span(item)
+        longest = max(longest, end - start)
+        duplicate_of = None
+
+        # kept is ordered by start, so once an item starts more than the
+        # longest span before this one, nothing earlier can overlap it.
+        for i in range(len(kept) - 1, -1, -1):
+            other_start, other_end = span(kept[i])
+            if other_start + longest <= start:
+                break
+
+            overlap = _overlap(start, end, other_start, other_end)
+            if overlap >= min_overlap or (overlap > 0 and key(item) == key(kept[i])):
+                duplicate_of = i
+                break
+
+        if duplicate_of is None:
+            kept.append(item)
+        elif confidence(item) > confidence(kept[duplicate_of]):
+            # The winner may start later than the copy it replaces; keep
+            # kept ordered by start for the early break above.
+            del kept[duplicate_of]
+            insort(kept, item, key=lambda other: span(other)[0])
+
+    return kept
@@ -0,0 +1,34 @@
+import hashlib
+import io
+from typing import Iterator
+
+import zstandard
+
+from app.lib.get_env import get_env_variable
+
+CODEC = "zstd"
+# Bodies are written once and read many times, so favour ratio over speed.
+ZSTD_LEVEL = int(get_env_variable("DOCUMENT_ZSTD_LEVEL", "10"))
+STREAM_CHUNK_CHARS = 64 * 1024
+
+
+def text_sha256(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def compress_text(text: str) -> bytes:
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(text.encode())
+
+
+def decompress_text(data: bytes) -> str:
+    return zstandard.ZstdDecompressor().decompress(data).decode()
+
+
+def iter_decompressed_text(
+    data: bytes, chunk_chars: int = STREAM_CHUNK_CHARS
+) -> Iterator[str]:
+    """Decode ``data`` a chunk at a time instead of inflating it whole."""
+    reader = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data))
+    with io.TextIOWrapper(reader, encoding="utf-8") as text:
+        while chunk := text.read(chunk_chars):
+            yield chunk
@@ -1,10 +1,461 @@
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from typing import List
 from pydantic import BaseModel, ValidationError
 from google import genai
+from google.genai import errors
+import asyncio
+import contextvars
 import json
+import logging
+import random
+import threading
+import time
+
+import httpx
+
+from app.core.chunking import dedupe_spans, split_into_chunks
+from app.core.resilience import CircuitBreaker, CircuitOpenError, Hedger
+from app.core.retrieval import Passage
+from app.lib.get_env import get_env_variable
+
+logger = logging.getLogger(__name__)
 
 client = genai.Client()
 
+EXTRACTION_MODEL = "gemini-3-pro-preview"
+# Bump whenever the extraction prompt below changes so cached claims are
+# not served for a different prompt.
+EXTRACTION_PROMPT_VERSION = "v1"
+REPORT_MODEL = "gemini-2.5-flash"
+# Bump whenever the report prompt changes so stored reports are regenerated.
+REPORT_PROMPT_VERSION = "v2"
+
+# Shared by every Gemini call in the process (API requests and workers).
+MAX_CONCURRENT_REQUESTS = int(get_env_variable("GEMINI_MAX_CONCURRENCY", "8"))
+REQUESTS_PER_MINUTE = int(get_env_variable("GEMINI_REQUESTS_PER_MINUTE", "60"))
+TOKENS_PER_MINUTE = int(get_env_variable("GEMINI_TOKENS_PER_MINUTE", "1000000"))
+MAX_RETRIES = int(get_env_variable("GEMINI_MAX_RETRIES", "4"))
+BACKOFF_BASE_SECONDS = 2.0
+BACKOFF_MAX_SECONDS = 30.0
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# Largest prompt, in estimated tokens, sent to each model. The budgets
+# below are clamped to fit, and anything larger is refused unsent.
+MAX_INPUT_TOKENS = {
+    EXTRACTION_MODEL: int(
+        get_env_variable("GEMINI_EXTRACTION_MAX_INPUT_TOKENS", "32000")
+    ),
+    REPORT_MODEL: int(get_env_variable("GEMINI_REPORT_MAX_INPUT_TOKENS", "16000")),
+}
+# Room left for the instructions wrapped around the input text.
+PROMPT_OVERHEAD_TOKENS = 1500
+
+# Documents up to BATCH_DOC_MAX_TOKENS are packed together into prompts of
+# at most BATCH_TOKEN_BUDGET estimated tokens.
+BATCH_TOKEN_BUDGET = min(
+    int(get_env_variable("EXTRACTION_BATCH_TOKEN_BUDGET", "8000")),
+    MAX_INPUT_TOKENS[EXTRACTION_MODEL] - PROMPT_OVERHEAD_TOKENS,
+)
+BATCH_DOC_MAX_TOKENS = int(get_env_variable("EXTRACTION_BATCH_DOC_MAX_TOKENS", "2000"))
+
+# Larger documents are split into chunks of about this size, with some
+# overlap so claims that straddle a cut are still seen whole once.
+CHUNK_TOKENS = min(
+    int(get_env_variable("EXTRACTION_CHUNK_TOKENS", "6000")),
+    MAX_INPUT_TOKENS[EXTRACTION_MODEL] - PROMPT_OVERHEAD_TOKENS,
+)
+CHUNK_OVERLAP_TOKENS = int(get_env_variable("EXTRACTION_CHUNK_OVERLAP_TOKENS", "300"))
+
+# Report prompts carry at most this many estimated tokens of retrieved
+# document passages and of engine evidence lines.
+REPORT_EVIDENCE_TOKENS = int(get_env_variable("REPORT_EVIDENCE_TOKENS", "1000"))
+REPORT_CONTEXT_TOKENS = min(
+    int(get_env_variable("REPORT_CONTEXT_TOKENS", "4000")),
+    MAX_INPUT_TOKENS[REPORT_MODEL] - REPORT_EVIDENCE_TOKENS - PROMPT_OVERHEAD_TOKENS,
+)
+
+HEDGE_ENABLED = get_env_variable("GEMINI_HEDGE_ENABLED", "true").lower() == "true"
+HEDGE_PERCENTILE = float(get_env_variable("GEMINI_HEDGE_PERCENTILE", "0.95"))
+BREAKER_FAILURE_RATE = float(get_env_variable("GEMINI_BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_OPEN_SECONDS = float(get_env_variable("GEMINI_BREAKER_OPEN_SECONDS", "30"))
+
+
+# Roughly four characters per token for English prose.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class PromptTooLargeError(ValueError):
+    """A prompt over the model's MAX_INPUT_TOKENS; it is never sent."""
+
+
+def _check_prompt_size(model: str, estimated: int):
+    limit = MAX_INPUT_TOKENS.get(model)
+    if limit is not None and estimated > limit:
+        logger.warning(
+            "Refusing a ~%d token prompt for %s (limit %d)", estimated, model, limit
+        )
+        raise PromptTooLargeError(
+            f"Prompt of ~{estimated} tokens exceeds the {limit} token limit for {model}"
+        )
+
+
+@dataclass
+class UsageRecord:
+    """One Gemini request. Token counts are None when the call failed."""
+
+    model: str
+    purpose: str
+    estimated_tokens: int
+    prompt_tokens: int | None
+    output_tokens: int | None
+    total_tokens: int | None
+    latency_ms: float
+    error: str | None = None
+
+
+@dataclass
+class UsageCollector:
+    endpoint: str
+    decision_id: int | None
+    records: list[UsageRecord] = field(default_factory=list)
+
+
+_usage_collector: contextvars.ContextVar[UsageCollector | None] = (
+    contextvars.ContextVar("gemini_usage_collector", default=None)
+)
+
+
+@contextmanager
+def track_usage(endpoint: str, decision_id: int | None = None):
+    """Collect a UsageRecord for every Gemini request made inside the block.
+
+    Tasks and asyncio.run loops started inside inherit the collector, so
+    batched and chunked extraction is covered too. Calls made outside any
+    block are not recorded.
+    """
+    with collect_usage(UsageCollector(endpoint, decision_id)) as collector:
+        yield collector
+
+
+@contextmanager
+def collect_usage(collector: UsageCollector):
+    """Record Gemini requests made inside the block into ``collector``."""
+    token = _usage_collector.set(collector)
+    try:
+        yield collector
+    finally:
+        _usage_collector.reset(token)
+
+
+async def iter_with_usage(stream, collector: UsageCollector):
+    """Iterate the async iterator ``stream``, collecting its usage.
+
+    The collector is installed only while ``stream`` computes its next item,
+    never across a yield: a generator suspended there may be closed from
+    another context (a client disconnecting mid-stream), and a ContextVar
+    cannot be reset from a context other than the one that set it.
+    """
+    try:
+        while True:
+            with collect_usage(collector):
+                try:
+                    item = await anext(stream)
+                except StopAsyncIteration:
+                    return
+            yield item
+    finally:
+        await stream.aclose()
+
+
+def _record_usage(
+    model: str,
+    purpose: str,
+    estimated: int,
+    started: float,
+    usage_metadata=None,
+    error: Exception | None = None,
+):
+    record = UsageRecord(
+        model=model,
+        purpose=purpose,
+        estimated_tokens=estimated,
+        prompt_tokens=getattr(usage_metadata, "prompt_token_count", None),
+        output_tokens=getattr(usage_metadata, "candidates_token_count", None),
+        total_tokens=getattr(usage_metadata, "total_token_count", None),
+        latency_ms=(time.monotonic() - started) * 1000.0,
+        error=type(error).__name__ if error is not None else None,
+    )
+    logger.debug("Gemini usage: %s", record)
+
+    collector = _usage_collector.get()
+    if collector is not None:
+        collector.records.append(record)
+
+
+class TokenBucket:
+    """Refills ``rate_per_minute`` units per minute, bursting up to one minute."""
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = float(rate_per_minute)
+        self.tokens = float(rate_per_minute)
+        self.rate_per_second = rate_per_minute / 60.0
+        self.updated_at = time.monotonic()
+        # Buckets are shared across event loops (API process, worker threads),
+        # so the bookkeeping is guarded by a thread lock that is never held
+        # across an await.
+        self._lock = threading.Lock()
+
+    def _try_take(self, amount: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.updated_at) * self.rate_per_second,
+            )
+            self.updated_at = now
+
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return 0.0
+
+            return (amount - self.tokens) / self.rate_per_second
+
+    async def acquire(self, amount: float = 1.0):
+        amount = min(amount, self.capacity)
+        while True:
+            wait = self._try_take(amount)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+
+_request_bucket = TokenBucket(REQUESTS_PER_MINUTE)
+_token_bucket = TokenBucket(TOKENS_PER_MINUTE)
+
+
+class ConcurrencyLimit:
+    """At most ``limit`` holders at once across every event loop in the process.
+
+    An asyncio.Semaphore only counts callers on its own loop, and sync callers
+    run a fresh loop per call, so the count is a thread-locked integer and
+    waiters poll it instead.
+    """
+
+    def __init__(self, limit: int, poll_seconds: float = 0.05):
+        self.limit = limit
+        self.poll_seconds = poll_seconds
+        self.in_use = 0
+        self._lock = threading.Lock()
+
+    def _try_enter(self) -> bool:
+        with self._lock:
+            if self.in_use >= self.limit:
+                return False
+            self.in_use += 1
+            return True
+
+    def _exit(self):
+        with self._lock:
+            self.in_use -= 1
+
+    async def __aenter__(self):
+        while not self._try_enter():
+            await asyncio.sleep(self.poll_seconds)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._exit()
+
+
+_concurrency = ConcurrencyLimit(MAX_CONCURRENT_REQUESTS)
+
+
+def is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, errors.APIError):
+        return exc.code in RETRYABLE_STATUS_CODES
+    return isinstance(exc, (httpx.TransportError, asyncio.TimeoutError))
+
+
+def backoff_delay(attempt: int) -> float:
+    # Full jitter: spreads retries from concurrent callers apart.
+    return random.uniform(
+        0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2**attempt)
+    )
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_hedgers: dict[str, Hedger] = {}
+
+
+def _breaker(model: str) -> CircuitBreaker:
+    if model not in _breakers:
+        _breakers[model] = CircuitBreaker(
+            failure_rate_threshold=BREAKER_FAILURE_RATE,
+            open_seconds=BREAKER_OPEN_SECONDS,
+            name=f"Gemini {model}",
+        )
+    return _breakers[model]
+
+
+def _hedger(model: str) -> Hedger:
+    if model not in _hedgers:
+        _hedgers[model] = Hedger(enabled=HEDGE_ENABLED, percentile=HEDGE_PERCENTILE)
+    return _hedgers[model]
+
+
+def resilience_state() -> dict:
+    """Breaker and hedging state per model, for operators."""
+    models = sorted(set(_breakers) | set(_hedgers))
+    return {
+        model: {
+            "circuit_breaker": _breaker(model).snapshot(),
+            "hedging": _hedger(model).snapshot(),
+        }
+        for model in models
+    }
+
+
+async def _call_once(
+    model: str, contents: str, estimated: int, purpose: str, charge: bool = True
+):
+    # Hedged duplicates pass charge=False, so a call is charged to the rate
+    # limit buckets once. Hedges only go out for calls slower than the hedge
+    # percentile, so they add roughly 1 - HEDGE_PERCENTILE to the traffic.
+    breaker = _breaker(model)
+    probe = breaker.before_call()
+
+    try:
+        if charge:
+            await _request_bucket.acquire()
+            await _token_bucket.acquire(estimated)
+
+        async with _concurrency:
+            started = time.monotonic()
+            try:
+                response = await client.aio.models.generate_content(
+                    model=model, contents=contents
+                )
+            except Exception as e:
+                _record_usage(model, purpose, estimated, started, error=e)
+                raise
+    except asyncio.CancelledError:
+        # The losing side of a hedge is cancelled; that is not a failure.
+        if probe:
+            breaker.release_probe()
+        raise
+    except Exception as e:
+        if is_retryable(e):
+            breaker.record_failure(probe)
+        elif probe:
+            breaker.release_probe()
+        raise
+
+    breaker.record_success(probe)
+    _record_usage(model, purpose, estimated, started, response.usage_metadata)
+    return response
+
+
+async def generate_content_async(model: str, contents: str, purpose: str = "other"):
+    """``purpose`` labels the request in the usage records."""
+    estimated = estimate_tokens(contents)
+    _check_prompt_size(model, estimated)
+    hedger = _hedger(model)
+
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return await hedger.run(
+                lambda: _call_once(model, contents, estimated, purpose),
+                hedge=lambda: _call_once(
+                    model, contents, estimated, purpose, charge=False
+                ),
+            )
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            if not is_retryable(e) or attempt == MAX_RETRIES:
+                raise
+
+            delay = backoff_delay(attempt)
+            logger.warning(
+                "Gemini %s busy or rate limited (%s); retry %d of %d in %.2fs",
+                model,
+                e,
+                attempt + 1,
+                MAX_RETRIES,
+                delay,
+            )
+            await asyncio.sleep(delay)
+
+
+async def generate_content_stream_async(
+    model: str, contents: str, purpose: str = "other"
+):
+    """Yield response text as Gemini produces it.
+
+    Retries are only possible before the first chunk has been handed out;
+    after that an error is raised to the consumer.
+    """
+    estimated = estimate_tokens(contents)
+    _check_prompt_size(model, estimated)
+    breaker = _breaker(model)
+
+    for attempt in range(MAX_RETRIES + 1):
+        probe = breaker.before_call()
+        started = False
+        request_started = time.monotonic()
+        usage_metadata = None
+
+        try:
+            await _request_bucket.acquire()
+            await _token_bucket.acquire(estimated)
+
+            async with _concurrency:
+                request_started = time.monotonic()
+                stream = await client.aio.models.generate_content_stream(
+                    model=model, contents=contents
+                )
+                async for chunk in stream:
+                    # Counts arrive with the final chunks.
+                    usage_metadata = chunk.usage_metadata or usage_metadata
+                    if chunk.text:
+                        started = True
+                        yield chunk.text
+        except (asyncio.CancelledError, GeneratorExit):
+            if probe:
+                breaker.release_probe()
+            raise
+        except Exception as e:
+            _record_usage(model, purpose, estimated, request_started, usage_metadata, e)
+            if is_retryable(e):
+                breaker.record_failure(probe)
+            elif probe:
+                breaker.release_probe()
+
+            if started or not is_retryable(e) or attempt == MAX_RETRIES:
+                raise
+
+            delay = backoff_delay(attempt)
+            logger.warning(
+                "Gemini %s busy or rate limited (%s); retry %d of %d in %.2fs",
+                model,
+                e,
+                attempt + 1,
+                MAX_RETRIES,
+                delay,
+            )
+            await asyncio.sleep(delay)
+            continue
+
+        breaker.record_success(probe)
+        _record_usage(model, purpose, estimated, request_started, usage_metadata)
+        return
+
 
 class GeminiClaim(BaseModel):
     claim_text: str
@@ -19,8 +470,8 @@ class GeminiClaimsOutput(BaseModel):
     claims: List[GeminiClaim]
 
 
-def extract_claims_from_text(prompt_text: str) -> GeminiClaimsOutput:
-    prompt = f"""
+def build_extraction_prompt(prompt_text: str) -> str:
+    return f"""
     Extract claims from the text below.
     Return JSON exactly in this format:
 
@@ -41,15 +492,8 @@ def extract_claims_from_text(prompt_text: str) -> GeminiClaimsOutput:
     \"\"\"{prompt_text}\"\"\"
     """
 
-    response = client.models.generate_content(
-        model="gemini-3-pro-preview",
-        # model="gemini-2.5-flash",
-        # model="gemini-pro-latest",
-        contents=prompt,
-    )
-
-    raw_text = response.text
 
+def _load_json_response(raw_text: str | None):
     if not raw_text:
         raise ValueError("Gemini returned empty response")
 
@@ -65,8 +509,14 @@ def extract_claims_from_text(prompt_text: str) -> GeminiClaimsOutput:
     try:
         data = json.loads(clean_text)
     except json.JSONDecodeError:
-        print(f"FAILED JSON: {clean_text}")
-        raise ValueError(f"Gemini output is not valid JSON")
+        logger.warning("Gemini output is not valid JSON: %.500s", clean_text)
+        raise ValueError("Gemini output is not valid JSON")
+
+    return data
+
+
+def parse_claims_response(raw_text: str | None) -> GeminiClaimsOutput:
+    data = _load_json_response(raw_text)
 
     try:
         validated = GeminiClaimsOutput.parse_obj(data)
@@ -76,24 +526,264 @@ def extract_claims_from_text(prompt_text: str) -> GeminiClaimsOutput:
     return validated
 
 
-def generate_consultant_report(
+async def extract_claims_async(prompt_text: str) -> GeminiClaimsOutput:
+    response = await generate_content_async(
+        model=EXTRACTION_MODEL,
+        # model="gemini-2.5-flash",
+        # model="gemini-pro-latest",
+        contents=build_extraction_prompt(prompt_text),
+        purpose="extraction",
+    )
+    return align_spans(parse_claims_response(response.text), prompt_text)
+
+
+def _claim_key(claim: GeminiClaim) -> str:
+    return " ".join((claim.normalized_text or claim.claim_text).lower().split())
+
+
+async def extract_claims_chunked_async(text: str) -> GeminiClaimsOutput:
+    """Extract a document of any size; spans are offsets into ``text``."""
+    chunks = split_into_chunks(
+        text,
+        CHUNK_TOKENS * CHARS_PER_TOKEN,
+        CHUNK_OVERLAP_TOKENS * CHARS_PER_TOKEN,
+    )
+    if len(chunks) == 1:
+        return await extract_claims_async(text)
+
+    outputs = await asyncio.gather(
+        *(extract_claims_async(chunk.text) for chunk in chunks)
+    )
+
+    claims = []
+    for chunk, output in zip(chunks, outputs):
+        for c in output.claims:
+            claims.append(
+                c.copy(
+                    update={
+                        "span_start": c.span_start + chunk.start,
+                        "span_end": c.span_end + chunk.start,
+                    }
+                )
+            )
+
+    return GeminiClaimsOutput(
+        claims=dedupe_spans(
+            claims,
+            key=_claim_key,
+            span=lambda c: (c.span_start, c.span_end),
+            confidence=lambda c: c.confidence,
+        )
+    )
+
+
+def extract_claims_from_text(prompt_text: str) -> GeminiClaimsOutput:
+    return asyncio.run(extract_claims_chunked_async(prompt_text))
+
+
+class GeminiDocumentClaims(BaseModel):
+    document_id: str
+    claims: List[GeminiClaim]
+
+
+class GeminiBatchClaimsOutput(BaseModel):
+    documents: List[GeminiDocumentClaims]
+
+
+def build_batch_extraction_prompt(documents: dict[str, str]) -> str:
+    blocks = "\n\n".join(
+        f"<<<DOCUMENT id={doc_id}>>>\n{text}\n<<<END DOCUMENT id={doc_id}>>>"
+        for doc_id, text in documents.items()
+    )
+
+    return f"""
+    Extract claims from each of the documents below. Documents are delimited
+    by <<<DOCUMENT id=...>>> and <<<END DOCUMENT id=...>>> markers. Treat
+    every document independently: span_start and span_end are character
+    offsets inside that document's own text, not the whole prompt.
+    Return JSON exactly in this format, with one entry per document id:
+
+    {{
+        "documents": [
+            {{
+                "document_id": "...",
+                "claims": [
+                    {{
+                        "claim_text": "...",
+                        "normalized_text": "...",
+                        "confidence": 0.0-1.0,
+                        "span_start": integer,
+                        "span_end": integer,
+                        "claim_type": "FACT|OPINION|INFERENCE"
+                    }}
+                ]
+            }}
+        ]
+    }}
+
+    {blocks}
+    """
+
+
+def align_spans(output: GeminiClaimsOutput, text: str) -> GeminiClaimsOutput:
+    """Point each claim's span at where its text actually occurs in ``text``."""
+    for c in output.claims:
+        if text[c.span_start : c.span_end] == c.claim_text:
+            continue
+
+        found = text.find(c.claim_text)
+        if found != -1:
+            c.span_start, c.span_end = found, found + len(c.claim_text)
+        else:
+            c.span_start = max(0, min(c.span_start, len(text)))
+            c.span_end = max(c.span_start, min(c.span_end, len(text)))
+
+    return output
+
+
+def parse_batch_claims_response(
+    raw_text: str | None, documents: dict[str, str]
+) -> dict[str, GeminiClaimsOutput]:
+    data = _load_json_response(raw_text)
+
+    try:
+        validated = GeminiBatchClaimsOutput.parse_obj(data)
+    except ValidationError as e:
+        raise ValueError(f"Gemini output failed validation: {e}")
+
+    # Documents the model skipped or invented are left out; the caller
+    # extracts anything missing on its own.
+    return {
+        entry.document_id: align_spans(
+            GeminiClaimsOutput(claims=entry.claims), documents[entry.document_id]
+        )
+        for entry in validated.documents
+        if entry.document_id in documents
+    }
+
+
+def pack_batches(documents: dict[str, str], token_budget: int) -> list[dict[str, str]]:
+    """Group documents, in order, into batches of at most ``token_budget``."""
+    batches = []
+    current, current_tokens = {}, 0
+
+    for doc_id, text in documents.items():
+        tokens = estimate_tokens(text)
+        if current and current_tokens + tokens > token_budget:
+            batches.append(current)
+            current, current_tokens = {}, 0
+        current[doc_id] = text
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+async def extract_claims_batch_async(
+    documents: dict[str, str],
+) -> dict[str, GeminiClaimsOutput]:
+    response = await generate_content_async(
+        model=EXTRACTION_MODEL,
+        contents=build_batch_extraction_prompt(documents),
+        purpose="extraction_batch",
+    )
+    return parse_batch_claims_response(response.text, documents)
+
+
+async def extract_claims_many_async(
+    documents: dict[str, str],
+) -> dict[str, GeminiClaimsOutput | Exception]:
+    """Extract several documents, packing the small ones into shared prompts.
+
+    Returns one entry per input key: the claims, or the exception that
+    stopped that document.
+    """
+    small = {
+        key: text
+        for key, text in documents.items()
+        if estimate_tokens(text) <= BATCH_DOC_MAX_TOKENS
+    }
+    results: dict[str, GeminiClaimsOutput | Exception] = {}
+
+    async def run_single(key: str):
+        try:
+            results[key] = await extract_claims_chunked_async(documents[key])
+        except Exception as e:
+            results[key] = e
+
+    async def run_batch(batch: dict[str, str]):
+        # Prompt ids are short positional labels; keys may be long hashes.
+        labels = {str(i + 1): key for i, key in enumerate(batch)}
+        try:
+            output = await extract_claims_batch_async(
+                {label: batch[key] for label, key in labels.items()}
+            )
+        except ValueError:
+            # Malformed batch answer: fall back to one prompt per document.
+            output = {}
+        except Exception as e:
+            for key in batch:
+                results[key] = e
+            return
+
+        for label, key in labels.items():
+            if label in output:
+                results[key] = output[label]
+
+        await asyncio.gather(*(run_single(key) for key in batch if key not in results))
+
+    tasks = [run_single(key) for key in documents if key not in small]
+    for batch in pack_batches(small, BATCH_TOKEN_BUDGET):
+        if len(batch) == 1:
+            tasks.append(run_single(next(iter(batch))))
+        else:
+            tasks.append(run_batch(batch))
+
+    await asyncio.gather(*tasks)
+    return results
+
+
+def _take_lines(lines: list[str], token_budget: int) -> list[str]:
+    taken, used = [], 0
+    for line in lines:
+        used += estimate_tokens(line)
+        if used > token_budget:
+            break
+        taken.append(line)
+    return taken
+
+
+def _format_passage(passage: Passage) -> str:
+    source = f"Document {passage.document_id}"
+    if passage.page_number is not None:
+        source += f", page {passage.page_number}"
+    return f"[{source}]\n{passage.text}"
+
+
+def build_report_prompt(
     winning_option_name: str,
     winning_score: float,
     engine_reasons: list[str],
-    all_document_texts: list[str],
+    passages: list[Passage],
 ) -> str:
-    full_document_context = "\n\n--- DOCUMENT SOURCE START ---\n\n".join(
-        all_document_texts
+    """``passages`` are already selected to fit REPORT_CONTEXT_TOKENS."""
+    evidence = "\n".join(
+        f"      - {line}"
+        for line in _take_lines(engine_reasons, REPORT_EVIDENCE_TOKENS)
     )
+    document_context = "\n\n".join(_format_passage(p) for p in passages)
 
-    context_prompt = f"""
+    return f"""
     You are an expert Chief Technology Officer (CTO) and Solution Architect.
     Your job is to synthesize a strategic implementation plan based *strictly* on the provided documentation and decision engine results.
     
     ### INPUT DATA
     - **Winning Option:** "{winning_option_name}" (Score: {winning_score})
-    - **Key Evidence:** {str(engine_reasons)[:10000]}... (truncated for focus)
-    - **Source Documents:** {full_document_context[:20000]}... (truncated)
+    - **Key Evidence:**
+{evidence}
+    - **Source Documents:** (the passages most relevant to the evidence)
+{document_context}
     
     ### ANTI-HALLUCINATION RULES:
     1. **Source Truth:** ONLY use info found in the Source Documents.
@@ -152,11 +842,59 @@ def generate_consultant_report(
     * **Risk:** [Weakness from logs] -> **Mitigation:** [Specific fix]
     """
 
-    response = client.models.generate_content(
-        model="gemini-2.5-flash", contents=context_prompt
+
+EMPTY_REPORT_TEXT = "## Error Generating Report\n\nThe AI model did not return any text. This is likely due to a safety filter trigger or an API issue."
+
+
+async def generate_consultant_report_async(
+    winning_option_name: str,
+    winning_score: float,
+    engine_reasons: list[str],
+    passages: list[Passage],
+) -> str:
+    context_prompt = build_report_prompt(
+        winning_option_name, winning_score, engine_reasons, passages
+    )
+
+    response = await generate_content_async(
+        model=REPORT_MODEL, contents=context_prompt, purpose="report"
     )
 
     if not response.text:
-        return "## Error Generating Report\n\nThe AI model did not return any text. This is likely due to a safety filter trigger or an API issue."
+        return EMPTY_REPORT_TEXT
 
     return response.text
+
+
+async def stream_consultant_report_async(
+    winning_option_name: str,
+    winning_score: float,
+    engine_reasons: list[str],
+    passages: list[Passage],
+):
+    context_prompt = build_report_prompt(
+        winning_option_name, winning_score, engine_reasons, passages
+    )
+
+    produced = False
+    async for text in generate_content_stream_async(
+        model=REPORT_MODEL, contents=context_prompt, purpose="report"
+    ):
+        produced = True
+        yield text
+
+    if not produced:
+        yield EMPTY_REPORT_TEXT
+
+
+def generate_consultant_report(
+    winning_option_name: str,
+    winning_score: float,
+    engine_reasons: list[str],
+    passages: list[Passage],
+) -> str:
+    return asyncio.run(
+        generate_consultant_report_async(
+            winning_option_name, winning_score, engine_reasons, passages
+        )
+    )
@@ -0,0 +1,64 @@
+import hashlib
+import re
+import zlib
+
+import numpy as np
+
+# Persisted signatures depend on all of these; changing any of them means
+# re-indexing every claim (python -m app.dev.backfill_claim_minhashes).
+NUM_PERMUTATIONS = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_CHARS = 5
+_PRIME = (1 << 31) - 1
+_SEED = 20240611
+
+_rng = np.random.default_rng(_SEED)
+_A = _rng.integers(1, _PRIME, NUM_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, NUM_PERMUTATIONS, dtype=np.uint64)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def shingles(text: str) -> set[str]:
+    text = _WHITESPACE.sub(" ", text.lower()).strip()
+    if len(text) <= SHINGLE_CHARS:
+        return {text}
+    return {text[i : i + SHINGLE_CHARS] for i in range(len(text) - SHINGLE_CHARS + 1)}
+
+
+def signature(text: str) -> np.ndarray:
+    """MinHash signature of ``text``'s character shingles."""
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode()) & _PRIME for s in shingles(text)), dtype=np.uint64
+    )
+    # (a * x + b) mod p stays below 2**62, so uint64 never overflows.
+    permuted = (_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def to_bytes(sig: np.ndarray) -> bytes:
+    return sig.astype("<u4").tobytes()
+
+
+def from_bytes(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype="<u4")
+
+
+def band_keys(sig: np.ndarray) -> list[int]:
+    """One signed 64-bit bucket key per band, for a BigInteger column."""
+    raw = to_bytes(sig)
+    width = ROWS_PER_BAND * 4
+    return [
+        int.from_bytes(
+            hashlib.blake2b(raw[i : i + width], digest_size=8).digest(),
+            "big",
+            signed=True,
+        )
+        for i in range(0, len(raw), width)
+    ]
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    return float(np.count_nonzero(a == b)) / NUM_PERMUTATIONS
@@ -0,0 +1,222 @@
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+from pdfminer.high_level import extract_pages
+from pdfminer.layout import LTTextContainer
+
+from app.lib.get_env import get_env_variable
+
+POOL_PROCESSES = int(get_env_variable("PDF_POOL_PROCESSES", "1"))
+TIMEOUT_SECONDS = float(get_env_variable("PDF_TIMEOUT_SECONDS", "120"))
+MEMORY_LIMIT_MB = int(get_env_variable("PDF_MEMORY_LIMIT_MB", "1024"))
+# Recycle children regularly; pdfminer's caches only grow.
+TASKS_PER_CHILD = int(get_env_variable("PDF_TASKS_PER_CHILD", "20"))
+# How often a waiting parent checks whether the child has finished or failed.
+POLL_SECONDS = 0.2
+
+# Joins pages in Document.content, like the form feed extract_text emits.
+PAGE_SEPARATOR = "\f"
+
+
+class PdfExtractionTimeout(TimeoutError):
+    pass
+
+
+class PdfPoolRestarted(RuntimeError):
+    """The pool was recycled while a document was being extracted."""
+
+
+@dataclass
+class Page:
+    page_number: int
+    char_start: int
+    char_end: int
+    text: str
+
+
+def iter_page_texts(file_location: str) -> Iterator[str]:
+    """Text of every page, read one page at a time."""
+    for layout in extract_pages(file_location):
+        yield "".join(
+            element.get_text()
+            for element in layout
+            if isinstance(element, LTTextContainer)
+        )
+
+
+def layout_pages(page_texts: Iterable[str]) -> tuple[str, list[Page]]:
+    """Join page texts into document content, keeping each page's offsets."""
+    texts, pages = [], []
+    start = 0
+    for number, text in enumerate(page_texts, start=1):
+        texts.append(text)
+        pages.append(Page(number, start, start + len(text), text))
+        start += len(text) + len(PAGE_SEPARATOR)
+    return PAGE_SEPARATOR.join(texts), pages
+
+
+def page_for_offset(page_starts: list[int], offset: int | None) -> int | None:
+    """Page number holding ``offset``, given each page's char_start in order."""
+    if offset is None or not page_starts:
+        return None
+    return max(1, bisect_right(page_starts, offset))
+
+
+def _init_child(memory_limit_mb: int):
+    # The worker's SIGTERM handler would stop terminate() from killing a
+    # stuck child, and Ctrl-C belongs to the parent.
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    if memory_limit_mb > 0:
+        try:
+            import resource
+
+            limit = memory_limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError) as e:
+            print(f"PDF worker memory limit not applied: {e}")
+
+
+def _send_page_texts(channel, file_location: str) -> int:
+    # Each page is handed to the parent as soon as it is read, so the child
+    # never holds more than one page of text.
+    count = 0
+    for text in iter_page_texts(file_location):
+        channel.put(text)
+        count += 1
+    return count
+
+
+class PdfExtractor:
+    """Runs pdfminer in a separate process pool.
+
+    A malformed or huge PDF costs at most TIMEOUT_SECONDS and
+    MEMORY_LIMIT_MB in a child process; on timeout the whole pool is
+    terminated and recreated, since a stuck pdfminer call cannot be
+    interrupted any other way. Each extraction streams its pages back
+    through its own queue, so up to ``processes`` run at once.
+    """
+
+    def __init__(
+        self,
+        processes: int = POOL_PROCESSES,
+        timeout: float = TIMEOUT_SECONDS,
+        memory_limit_mb: int = MEMORY_LIMIT_MB,
+        tasks_per_child: int = TASKS_PER_CHILD,
+    ):
+        self.processes = processes
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.tasks_per_child = tasks_per_child
+        self._pool = None
+        self._manager = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        # A pool inherited across fork is unusable; start a fresh one.
+        if self._pool is None or self._pid != os.getpid():
+            # Page queues live in the manager process, so a child killed
+            # mid-put breaks only its own connection.
+            self._manager = multiprocessing.Manager()
+            self._pool = multiprocessing.Pool(
+                self.processes,
+                initializer=_init_child,
+                initargs=(self.memory_limit_mb,),
+                maxtasksperchild=self.tasks_per_child,
+            )
+            self._pid = os.getpid()
+        return self._pool
+
+    def _reset(self):
+        # Cleared first, so extractions cut off below see the restart.
+        pool, manager = self._pool, self._manager
+        self._pool = None
+        self._manager = None
+        if pool is not None and self._pid == os.getpid():
+            pool.terminate()
+            pool.join()
+            manager.shutdown()
+
+    def iter_pages(self, file_location: str) -> Iterator[str]:
+        """Yield each page's text as soon as the child has read it.
+
+        The timeout covers the whole document. If another extraction's
+        timeout recycles the pool meanwhile, the document is submitted
+        again and the pages already yielded are skipped.
+        """
+        deadline = time.monotonic() + self.timeout
+        sent = 0
+        while True:
+            try:
+                for index, text in enumerate(
+                    self._stream_pages(file_location, deadline)
+                ):
+                    if index == sent:
+                        sent += 1
+                        yield text
+                return
+            except PdfPoolRestarted:
+                continue
+
+    def _stream_pages(self, file_location: str, deadline: float) -> Iterator[str]:
+        # The lock is held only to submit the task; every extraction reads
+        # its own queue, so up to ``processes`` of them run side by side.
+        with self._lock:
+            pool = self._get_pool()
+            channel = self._manager.Queue()
+            result = pool.apply_async(_send_page_texts, (channel, file_location))
+        received, total = 0, None
+
+        try:
+            while total is None or received < total:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PdfExtractionTimeout(
+                        f"PDF extraction exceeded {self.timeout:.0f}s: "
+                        f"{file_location}"
+                    )
+                if total is None and result.ready():
+                    # Raises the child's error; else the page count.
+                    total = result.get()
+                    continue
+
+                try:
+                    text = channel.get(timeout=min(remaining, POLL_SECONDS))
+                except queue.Empty:
+                    continue
+                except (EOFError, OSError) as e:
+                    # The manager holding the queue went down with the pool.
+                    if self._pool is not pool:
+                        raise PdfPoolRestarted(file_location) from e
+                    raise
+                received += 1
+                yield text
+        finally:
+            # Timed out, or the caller stopped reading early.
+            if not result.ready():
+                with self._lock:
+                    if self._pool is pool:
+                        self._reset()
+
+    def extract(self, file_location: str) -> list[str]:
+        return list(self.iter_pages(file_location))
+
+    def close(self):
+        if self._pool is not None and self._pid == os.getpid():
+            self._pool.close()
+            self._pool.join()
+            self._manager.shutdown()
+        self._pool = None
+        self._manager = None
+
+
+pdf_extractor = PdfExtractor()
@@ -0,0 +1,244 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies, used to pick hedge delays."""
+
+    def __init__(self, window: int = 200):
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p: float) -> float | None:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(p * len(samples)))
+        return samples[index]
+
+    def __len__(self):
+        return len(self._samples)
+
+
+class CircuitBreaker:
+    """Opens when the recent failure rate crosses a threshold.
+
+    While open every call fails fast with CircuitOpenError. After
+    ``open_seconds`` a single probe call is let through (half-open); its
+    outcome closes the breaker again or re-opens it. before_call() tells the
+    caller whether it holds the probe, and only that caller passes
+    ``probe=True`` to record_* or calls release_probe(); outcomes of calls
+    started before the breaker opened are ignored until it closes.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_rate_threshold: float = 0.5,
+        min_calls: int = 10,
+        window_seconds: float = 60.0,
+        open_seconds: float = 30.0,
+        name: str = "circuit",
+    ):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+
+        self.state = self.CLOSED
+        self.opened_at: float | None = None
+        self.times_opened = 0
+        self._probe_in_flight = False
+        self._outcomes: deque[tuple[float, bool]] = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float):
+        while self._outcomes and self._outcomes[0][0] < now - self.window_seconds:
+            self._outcomes.popleft()
+
+    def before_call(self) -> bool:
+        """Raise CircuitOpenError, or return whether this call is the probe."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return False
+
+            now = time.monotonic()
+            if self.state == self.OPEN:
+                if now - self.opened_at < self.open_seconds:
+                    raise CircuitOpenError("Gemini circuit breaker is open")
+                self.state = self.HALF_OPEN
+                logger.info(
+                    "%s breaker half-open; letting one probe through", self.name
+                )
+
+            if self._probe_in_flight:
+                raise CircuitOpenError("Gemini circuit breaker is half-open")
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self, probe: bool = False):
+        with self._lock:
+            now = time.monotonic()
+            if self.state != self.CLOSED:
+                if not (probe and self.state == self.HALF_OPEN):
+                    return
+                self.state = self.CLOSED
+                self._probe_in_flight = False
+                self._outcomes.clear()
+                logger.info("%s breaker closed after a successful probe", self.name)
+            self._outcomes.append((now, True))
+            self._trim(now)
+
+    def record_failure(self, probe: bool = False):
+        with self._lock:
+            now = time.monotonic()
+            if self.state != self.CLOSED:
+                if probe and self.state == self.HALF_OPEN:
+                    logger.warning("%s breaker probe failed", self.name)
+                    self._open(now)
+                return
+
+            self._outcomes.append((now, False))
+            self._trim(now)
+
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if (
+                len(self._outcomes) >= self.min_calls
+                and failures / len(self._outcomes) >= self.failure_rate_threshold
+            ):
+                logger.warning(
+                    "%s breaker: %d of the last %d calls failed",
+                    self.name,
+                    failures,
+                    len(self._outcomes),
+                )
+                self._open(now)
+
+    def release_probe(self):
+        # A half-open probe that ended in a non-counted error (e.g. a bad
+        # request) or was cancelled must not leave the breaker stuck waiting
+        # for it. Only the call that before_call() made the probe calls this.
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probe_in_flight = False
+
+    def _open(self, now: float):
+        self.state = self.OPEN
+        self.opened_at = now
+        self.times_opened += 1
+        self._probe_in_flight = False
+        self._outcomes.clear()
+        logger.warning("%s breaker open for %.0fs", self.name, self.open_seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            calls = len(self._outcomes)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            return {
+                "state": self.state,
+                "recent_calls": calls,
+                "recent_failure_rate": failures / calls if calls else 0.0,
+                "times_opened": self.times_opened,
+                "seconds_until_probe": (
+                    max(0.0, self.open_seconds - (now - self.opened_at))
+                    if self.state == self.OPEN
+                    else None
+                ),
+            }
+
+
+class Hedger:
+    """Sends a duplicate request once the first one is slower than usual."""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        percentile: float = 0.95,
+        min_samples: int = 20,
+        min_delay_seconds: float = 1.0,
+    ):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay_seconds = min_delay_seconds
+        self.latency = LatencyTracker()
+
+        self.calls = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+
+    def delay(self) -> float | None:
+        if not self.enabled or len(self.latency) < self.min_samples:
+            return None
+        return max(self.min_delay_seconds, self.latency.percentile(self.percentile))
+
+    async def run(self, call, hedge=None):
+        """Await ``call()``; start ``hedge()`` after the hedge delay.
+
+        ``hedge`` defaults to ``call``.
+        """
+        self.calls += 1
+        started = time.monotonic()
+        delay = self.delay()
+
+        if delay is None:
+            result = await call()
+            self.latency.record(time.monotonic() - started)
+            return result
+
+        primary = asyncio.ensure_future(call())
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                self.hedges_sent += 1
+                pending.add(asyncio.ensure_future((hedge or call)()))
+
+            failure = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedges_won += 1
+                        self.latency.record(time.monotonic() - started)
+                        return task.result()
+                    failure = failure or task.exception()
+
+            raise failure
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "calls": self.calls,
+            "hedges_sent": self.hedges_sent,
+            "hedges_won": self.hedges_won,
+            "current_delay_seconds": self.delay(),
+            "p50_seconds": self.latency.percentile(0.5),
+            "p95_seconds": self.latency.percentile(0.95),
+        }
@@ -0,0 +1,145 @@
+import itertools
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+
+import numpy as np
+from scipy import sparse
+
+from app.core.text_vectors import tokenize
+
+PASSAGE_CHARS = 1200
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n|\f")
+
+
+@dataclass
+class Passage:
+    document_id: int
+    page_number: int | None
+    text: str
+
+
+def _split_long(paragraph: str, max_chars: int) -> list[str]:
+    parts = []
+    while len(paragraph) > max_chars:
+        cut = paragraph.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        parts.append(paragraph[:cut])
+        paragraph = paragraph[cut:].lstrip()
+    if paragraph:
+        parts.append(paragraph)
+    return parts
+
+
+def split_passages(text: str, max_chars: int = PASSAGE_CHARS) -> list[str]:
+    """Consecutive paragraphs of ``text`` packed into runs of ``max_chars``."""
+    passages, current = [], ""
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        paragraph = " ".join(paragraph.split())
+        for part in _split_long(paragraph, max_chars):
+            if current and len(current) + len(part) + 1 > max_chars:
+                passages.append(current)
+                current = ""
+            current = f"{current} {part}" if current else part
+    if current:
+        passages.append(current)
+    return passages
+
+
+class Bm25Index:
+    """Okapi BM25 over a fixed list of passages.
+
+    The inverted index is a sparse passage x term matrix of precomputed
+    BM25 term weights, so scoring any number of queries is one sparse
+    product.
+    """
+
+    def __init__(self, texts: list[str], k1: float = BM25_K1, b: float = BM25_B):
+        # Unseen tokens get the next column.
+        vocabulary = defaultdict(itertools.count().__next__)
+        cols, lengths = [], []
+        for text in texts:
+            ids = [vocabulary[token] for token in tokenize(text)]
+            cols.extend(ids)
+            lengths.append(len(ids))
+        self.vocabulary = dict(vocabulary)
+
+        indptr = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        tf = sparse.csr_matrix(
+            (
+                np.ones(len(cols), dtype=np.float32),
+                np.array(cols, dtype=np.int64),
+                indptr,
+            ),
+            shape=(len(texts), len(self.vocabulary)),
+        )
+        tf.sum_duplicates()
+
+        n = max(len(texts), 1)
+        lengths = np.array(lengths, dtype=np.float32)
+        df = np.bincount(tf.indices, minlength=len(self.vocabulary))
+        idf = np.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+        # tf * (k1 + 1) / (tf + k1 * (1 - b + b * len / avg_len)), times idf.
+        norm = k1 * (1.0 - b + b * lengths / max(lengths.mean(), 1.0))
+        doc_norm = np.repeat(norm, np.diff(tf.indptr))
+        tf.data = tf.data * (k1 + 1.0) / (tf.data + doc_norm) * idf[tf.indices]
+        self.weights = tf
+
+    def score(self, queries: list[str]) -> np.ndarray:
+        """BM25 score of every passage for each query, queries x passages."""
+        rows, cols = [], []
+        for i, query in enumerate(queries):
+            for token in set(tokenize(query)):
+                col = self.vocabulary.get(token)
+                if col is not None:
+                    rows.append(i)
+                    cols.append(col)
+        terms = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=(len(queries), len(self.vocabulary)),
+        )
+        return (terms @ self.weights.T).toarray()
+
+
+def select_passages(
+    passages: list[Passage],
+    queries: list[str],
+    token_budget: int,
+    estimate_tokens,
+) -> list[Passage]:
+    """The passages most relevant to ``queries`` that fit in ``token_budget``.
+
+    Each query's scores are scaled to its best passage before summing, so a
+    passage that matches many queries beats one that matches a single long
+    query very well. Picked passages keep their original order.
+    """
+    if not passages or token_budget <= 0:
+        return []
+
+    relevance = np.zeros(len(passages))
+    if queries:
+        scores = Bm25Index([p.text for p in passages]).score(queries)
+        best = scores.max(axis=1, keepdims=True)
+        best[best == 0] = 1.0
+        relevance = (scores / best).sum(axis=0)
+
+    # Without any match, fall back to the leading passages.
+    candidates = np.argsort(-relevance, kind="stable")
+    if relevance.any():
+        candidates = candidates[relevance[candidates] > 0]
+
+    picked, used = [], 0
+    for i in candidates:
+        cost = estimate_tokens(passages[i].text)
+        if used + cost > token_budget:
+            continue
+        picked.append(int(i))
+        used += cost
+
+    return [passages[i] for i in sorted(picked)]
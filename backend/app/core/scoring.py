@@ -1,4 +1,4 @@
-from collections import defaultdict, deque
+from collections import defaultdict
 
 EFFECT_MULTIPLIER = {
     "supports": 1.0,
@@ -6,64 +6,93 @@ EFFECT_MULTIPLIER = {
     "blocks": -2.0,
 }
 
+# How influence carries across a ClaimRelation, before strength and decay.
+RELATION_MULTIPLIER = {
+    "supports": 1.0,
+    "refines": 0.8,
+    "assumes": 0.5,
+    "contradicts": -1.0,
+}
 
-def score_option_with_propagation(claim_links, max_depth=2):
-    graph = defaultdict(list)
-    base_confidence = {}
+DECAY = 0.5
+MAX_DEPTH = 4
+# Influence smaller than this is dropped instead of propagated further.
+EPSILON = 1e-3
 
-    for link in claim_links:
-        claim = link.claim
-        graph[claim.id].extend(claim.outgoing_relations)  # outgoing ClaimRelation
-        base_confidence[claim.id] = (
-            claim.confidence * link.weight * EFFECT_MULTIPLIER[link.effect.value]
-        )
 
+def relation_factor(relation_type: str, strength: float) -> float:
+    return DECAY * RELATION_MULTIPLIER[relation_type] * strength
+
+
+def propagate(seeds, edges_from, max_depth=MAX_DEPTH, epsilon=EPSILON):
+    """Spread influence from ``seeds`` (claim id -> base influence).
+
+    ``edges_from(claim_id)`` returns (to_claim_id, relation_type, strength)
+    for the claim's outgoing relations. Each level moves the whole frontier
+    one hop: influence arriving at the same claim is summed first, then
+    anything below ``epsilon`` is dropped. Every hop scales influence by at
+    most DECAY, so cycles die out and the walk stops at convergence or at
+    ``max_depth``, whichever comes first. Frontier claims are visited in id
+    order, so the result does not depend on link order.
+
+    Returns the influence deposited on every claim reached.
+    """
     final_scores = defaultdict(float)
-    visited = set()
+    frontier = dict(seeds)
+
+    for depth in range(max_depth + 1):
+        for claim_id, influence in frontier.items():
+            final_scores[claim_id] += influence
+
+        if depth == max_depth:
+            break
+
+        next_frontier = defaultdict(float)
+        for claim_id in sorted(frontier):
+            influence = frontier[claim_id]
+            for to_claim_id, relation_type, strength in edges_from(claim_id):
+                next_frontier[to_claim_id] += influence * relation_factor(
+                    relation_type, strength
+                )
+
+        frontier = {
+            claim_id: influence
+            for claim_id, influence in next_frontier.items()
+            if abs(influence) >= epsilon
+        }
+        if not frontier:
+            break
+
+    return final_scores
+
+
+def score_option_with_propagation(claim_links, max_depth=MAX_DEPTH):
+    claims = {}
+    seeds = defaultdict(float)
 
     for link in claim_links:
         claim = link.claim
-        base_confidence[claim.id] = (
+        claims[claim.id] = claim
+        seeds[claim.id] += (
             claim.confidence * link.weight * EFFECT_MULTIPLIER[link.effect.value]
         )
 
-        propagate_claim(
-            claim,
-            base_confidence[claim.id],
-            graph,
-            final_scores,
-            visited,
-            depth=0,
-            max_depth=max_depth,
-        )
+    def edges_from(claim_id):
+        edges = []
+        for rel in claims[claim_id].outgoing_relations:
+            claims.setdefault(rel.to_claim_id, rel.to_claim)
+            edges.append((rel.to_claim_id, rel.relation_type.value, rel.strength))
+        return edges
+
+    final_scores = propagate(seeds, edges_from, max_depth=max_depth)
 
     reasons = []
     for link in claim_links:
         claim = link.claim
-        contrib = base_confidence[claim.id]
+        contrib = claim.confidence * link.weight * EFFECT_MULTIPLIER[link.effect.value]
         reasons.append(
             f"{link.effect.value.upper()}: {claim.text[:80]}... => {contrib:.3f}"
         )
 
     total_score = sum(final_scores.values())
     return total_score, reasons
-
-
-def propagate_claim(claim, influence, graph, final_scores, visited, depth, max_depth):
-    if depth > max_depth or (claim.id, depth) in visited:
-        return
-
-    visited.add((claim.id, depth))
-    final_scores[claim.id] += influence
-
-    for rel in graph.get(claim.id, []):
-        next_influence = influence * 0.5
-        propagate_claim(
-            rel.to_claim,
-            next_influence,
-            graph,
-            final_scores,
-            visited,
-            depth + 1,
-            max_depth,
-        )
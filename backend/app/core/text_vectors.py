@@ -0,0 +1,220 @@
+import re
+import zlib
+from typing import Iterator
+
+import numpy as np
+from scipy import sparse
+
+N_FEATURES = 1 << 18
+_TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN.findall(text.lower())
+
+
+NEGATIONS = frozenset(
+    {
+        "not",
+        "no",
+        "never",
+        "none",
+        "nor",
+        "neither",
+        "nothing",
+        "cannot",
+        "without",
+        "fails",
+        "failed",
+        "lacks",
+    }
+)
+
+
+def is_negated(text: str) -> bool:
+    """Whether ``text`` reads as negated; an even number of negations cancels."""
+    count = sum(token in NEGATIONS or token.endswith("n't") for token in tokenize(text))
+    return count % 2 == 1
+
+
+# Function words carry no topic; left in, they make any two sentences look
+# alike. Negations are dropped too, since polarity is handled separately.
+STOPWORDS = frozenset("""
+    about above after again against all also among and any are aren't as at
+    because been before being below between both but by can could did didn't
+    does doesn't doing don't down during each either else even ever every few
+    for from further had hadn't has hasn't have haven't having he her here
+    hers herself him himself his how however i if in into is isn't it it's
+    its itself just least less let's like made make many may me might more
+    most much must my myself need neither never no nor not of off on once
+    one only or other our ours ourselves out over own per rather same shall
+    she should shouldn't since so some still such than that that's the their
+    theirs them themselves then there there's these they this those though
+    through thus to too under until up upon us very via was wasn't we well
+    were weren't what what's when where whether which while who whom whose
+    why will with within without won't would wouldn't yet you your yours
+    yourself yourselves
+    """.split())
+MIN_TOKEN_CHARS = 3
+# Longest first; a crude stemmer so "migrate"/"migration" or "cost"/"costs"
+# share a feature.
+_SUFFIXES = ("ations", "ation", "ings", "ions", "ing", "ion", "ed", "es", "s", "e")
+
+
+def _stem(token: str) -> str:
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= MIN_TOKEN_CHARS:
+            return token[: -len(suffix)]
+    return token
+
+
+def content_tokens(text: str) -> list[str]:
+    """Stemmed tokens of ``text`` without stopwords and very short tokens."""
+    return [
+        _stem(token)
+        for token in tokenize(text)
+        if len(token) >= MIN_TOKEN_CHARS and token not in STOPWORDS
+    ]
+
+
+# Words saying which way something moves. Each one flips a claim's
+# direction, as a negation does, so "costs drop" and "costs will not rise"
+# agree while "churn increased" and "churn decreased" do not.
+_DECREASE_WORDS = """
+    cut cuts cutting decrease decreased decreases decline declined declines
+    drop dropped drops fall fell falls fewer lack limited lose loss lost
+    lower lowered reduce reduced reduces reduction shrink shrank
+    """.split()
+_INCREASE_WORDS = """
+    boost boosted expand expanded gain gained grew grow grown growth higher
+    improve improved improves increase increased increases raise raised
+    rise rises rising rose
+    """.split()
+DECREASE_STEMS = frozenset(_stem(word) for word in _DECREASE_WORDS)
+DIRECTION_STEMS = DECREASE_STEMS | frozenset(_stem(w) for w in _INCREASE_WORDS)
+
+
+def direction(text: str) -> bool:
+    """Whether ``text`` points down or is negated; an even count cancels."""
+    flips = 0
+    for token in tokenize(text):
+        if token in NEGATIONS or token.endswith("n't"):
+            flips += 1
+        elif _stem(token) in DECREASE_STEMS:
+            flips += 1
+    return flips % 2 == 1
+
+
+def content_signature(text: str) -> tuple:
+    """(words, numbers, direction) of a claim, for near-duplicate checks.
+
+    Words are the stemmed content words without negations or direction
+    words, so "cut" and "reduce", or "lacks" and "has limited", leave the
+    same words and the same direction. Numbers and direction are what a
+    restatement must keep ("10%"/"12%", "offers"/"does not offer").
+    """
+    tokens = tokenize(text)
+    numbers = frozenset(token for token in tokens if any(c.isdigit() for c in token))
+    words = frozenset(
+        stem
+        for stem in content_tokens(text)
+        if stem not in DIRECTION_STEMS and stem not in NEGATIONS
+    )
+    return words, numbers, direction(text)
+
+
+def _features(tokens: list[str]) -> Iterator[str]:
+    yield from tokens
+    for a, b in zip(tokens, tokens[1:]):
+        yield f"{a} {b}"
+
+
+def hashed_counts(texts: list[str], n_features: int = N_FEATURES):
+    """Sublinear term counts of hashed unigrams and bigrams, one row per text.
+
+    Feature hashing needs no vocabulary pass, so the matrix is built in one
+    sweep. Stopwords are dropped before hashing.
+    """
+    rows, cols = [], []
+    for i, text in enumerate(texts):
+        for feature in _features(content_tokens(text)):
+            rows.append(i)
+            cols.append(zlib.crc32(feature.encode()) % n_features)
+
+    counts = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+        shape=(len(texts), n_features),
+    )
+    counts.sum_duplicates()
+    counts.data = 1.0 + np.log(counts.data)
+    return counts
+
+
+def corpus_idf(counts) -> np.ndarray:
+    """Unsmoothed idf, log(n / df); zero for features absent from the corpus.
+
+    A feature found in every text gets no weight at all.
+    """
+    df = np.bincount(counts.indices, minlength=counts.shape[1])
+    idf = np.zeros(counts.shape[1], dtype=np.float32)
+    present = df > 0
+    idf[present] = np.log(counts.shape[0] / df[present])
+    return idf
+
+
+def tfidf_rows(counts, idf: np.ndarray):
+    """L2-normalised TF-IDF rows of ``counts`` under ``idf``."""
+    tfidf = counts.multiply(idf).tocsr()
+    tfidf.eliminate_zeros()
+
+    norms = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms).astype(np.float32) @ tfidf
+
+
+def hashed_tfidf(texts: list[str], n_features: int = N_FEATURES):
+    """TF-IDF rows of ``texts``, with IDF taken from the same ``texts``."""
+    counts = hashed_counts(texts, n_features)
+    return tfidf_rows(counts, corpus_idf(counts))
+
+
+def top_k_similar(
+    left,
+    right,
+    k: int,
+    min_similarity: float,
+    block_rows: int = 512,
+    exclude_self=False,
+):
+    """Yield (left_index, right_index, similarity) for each left row's top ``k``.
+
+    Rows of ``left`` are multiplied against ``right`` one block at a time
+    and only the nonzero products are ranked, so work follows the number of
+    shared features rather than len(left) x len(right). Pairs with no
+    feature in common are never yielded. With ``exclude_self`` (left is
+    right) a row never matches itself.
+    """
+    right_t = right.T.tocsr()
+    if k <= 0:
+        return
+
+    for start in range(0, left.shape[0], block_rows):
+        block = (left[start : start + block_rows] @ right_t).tocsr()
+        rows = np.repeat(np.arange(block.shape[0]), np.diff(block.indptr))
+        cols, scores = block.indices, block.data
+
+        keep = scores >= min_similarity
+        if exclude_self:
+            keep &= cols != rows + start
+        rows, cols, scores = rows[keep], cols[keep], scores[keep]
+
+        # Best first within each row, then cut every row at k. Scores are
+        # cosines in [0, 1], so one float key sorts by row, then score.
+        order = np.argsort(rows - scores.astype(np.float64) * 0.5)
+        rows, cols, scores = rows[order], cols[order], scores[order]
+        counts = np.bincount(rows, minlength=block.shape[0])
+        first = np.cumsum(counts) - counts
+        top = np.arange(len(rows)) - first[rows] < k
+
+        for row, col, score in zip(rows[top], cols[top], scores[top]):
+            yield start + int(row), int(col), float(score)
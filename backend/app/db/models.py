@@ -5,17 +5,33 @@ from datetime import datetime
 from typing import List
 
 from sqlalchemy import (
+    BigInteger,
     Column,
+    Computed,
     DateTime,
     Enum as SAEnum,
     Float,
     ForeignKey,
+    Index,
+    Integer,
+    JSON,
+    LargeBinary,
+    SmallInteger,
     String,
     Text,
     UniqueConstraint,
     func,
 )
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Mapped, deferred, mapped_column, relationship
+
+from app.core.compression import (
+    CODEC,
+    compress_text,
+    decompress_text,
+    iter_decompressed_text,
+    text_sha256,
+)
 
 from .base import Base
 
@@ -39,6 +55,13 @@ class ClaimEffect(enum.Enum):
     blocks = "blocks"
 
 
+class JobStatus(enum.Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
 class Decision(Base):
     __tablename__ = "decisions"
 
@@ -67,13 +90,112 @@ class Document(Base):
 
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     source: Mapped[str | None] = mapped_column(String(255), nullable=True)
-    content: Mapped[str] = mapped_column(Text, nullable=False)
+    # sha256 of the uploaded file, to reuse text and claims on re-upload
+    content_sha256: Mapped[str | None] = mapped_column(String(64), nullable=True)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
 
     claims: Mapped[List["Claim"]] = relationship(back_populates="document")
+    # Claims found here that were merged into a claim of another document.
+    merged_claims: Mapped[List["ClaimProvenance"]] = relationship(
+        back_populates="document"
+    )
+    pages: Mapped[List["DocumentPage"]] = relationship(
+        back_populates="document",
+        cascade="all, delete-orphan",
+        order_by="DocumentPage.page_number",
+    )
+    # Loaded only when content is first touched.
+    body: Mapped["DocumentBody"] = relationship(
+        back_populates="document",
+        uselist=False,
+        cascade="all, delete-orphan",
+        lazy="select",
+    )
 
     decision: Mapped["Decision"] = relationship(back_populates="documents")
 
+    __table_args__ = (
+        Index("ix_documents_decision_id", "decision_id"),
+        Index("ix_documents_content_sha256", "content_sha256"),
+    )
+
+    @property
+    def content(self) -> str:
+        return self.body.text if self.body is not None else ""
+
+    @content.setter
+    def content(self, text: str):
+        if self.body is None:
+            self.body = DocumentBody()
+        self.body.set_text(text)
+
+    def iter_content(self, chunk_chars: int | None = None):
+        if self.body is None:
+            return iter(())
+        return self.body.iter_text(chunk_chars)
+
+
+class DocumentBody(Base):
+    """Compressed text of a document, kept out of the documents table."""
+
+    __tablename__ = "document_bodies"
+
+    document_id: Mapped[int] = mapped_column(
+        ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True
+    )
+    codec: Mapped[str] = mapped_column(String(16), nullable=False)
+    char_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    # sha256 of the uncompressed text, so callers can compare bodies
+    # without decompressing them
+    sha256: Mapped[str] = mapped_column(String(64), nullable=False)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+    document: Mapped["Document"] = relationship(back_populates="body")
+
+    def set_text(self, text: str):
+        self.codec = CODEC
+        self.char_count = len(text)
+        self.sha256 = text_sha256(text)
+        self.data = compress_text(text)
+
+    @property
+    def text(self) -> str:
+        return decompress_text(self.data)
+
+    def iter_text(self, chunk_chars: int | None = None):
+        if chunk_chars is None:
+            return iter_decompressed_text(self.data)
+        return iter_decompressed_text(self.data, chunk_chars)
+
+
+class DocumentPage(Base):
+    __tablename__ = "document_pages"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    document_id: Mapped[int] = mapped_column(
+        ForeignKey("documents.id", ondelete="CASCADE"), nullable=False
+    )
+    # 1-based; char offsets are into Document.content
+    page_number: Mapped[int] = mapped_column(Integer, nullable=False)
+    char_start: Mapped[int] = mapped_column(Integer, nullable=False)
+    char_end: Mapped[int] = mapped_column(Integer, nullable=False)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed("to_tsvector('english', text)", persisted=True),
+        )
+    )
+
+    document: Mapped["Document"] = relationship(back_populates="pages")
+
+    __table_args__ = (
+        UniqueConstraint("document_id", "page_number"),
+        Index(
+            "ix_document_pages_search_vector", "search_vector", postgresql_using="gin"
+        ),
+    )
+
 
 class Claim(Base):
     __tablename__ = "claims"
@@ -86,10 +208,28 @@ class Claim(Base):
     confidence: Mapped[float] = mapped_column(Float, default=0.5)
     scope: Mapped[str | None] = mapped_column(String(255), nullable=True)
 
+    # character offsets of the claim inside Document.content
+    span_start: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    span_end: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # page of span_start, when the document has page records
+    page_number: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # The claim as written weighs more than its normalized form.
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                "setweight(to_tsvector('english', text), 'A') || "
+                "setweight(to_tsvector('english', coalesce(normalized_text, '')), 'B')",
+                persisted=True,
+            ),
+        )
+    )
+
     document_id: Mapped[int] = mapped_column(ForeignKey("documents.id"), nullable=False)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
 
     document: Mapped["Document"] = relationship(back_populates="claims")
+    provenance: Mapped[List["ClaimProvenance"]] = relationship(back_populates="claim")
 
     outgoing_relations: Mapped[List["ClaimRelation"]] = relationship(
         foreign_keys="ClaimRelation.from_claim_id",
@@ -101,6 +241,12 @@ class Claim(Base):
         back_populates="to_claim",
     )
 
+    __table_args__ = (
+        # Matches the ORDER BY of the per-document claim loads.
+        Index("ix_claims_document_span", "document_id", "span_start", "id"),
+        Index("ix_claims_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
 
 class ClaimRelation(Base):
     __tablename__ = "claim_relations"
@@ -126,6 +272,13 @@ class ClaimRelation(Base):
 
     __table_args__ = (
         UniqueConstraint("from_claim_id", "to_claim_id", "relation_type"),
+        # Covering, so graph walks in either direction are index-only scans.
+        Index(
+            "ix_claim_relations_from",
+            "from_claim_id",
+            postgresql_include=["to_claim_id", "relation_type", "strength"],
+        ),
+        Index("ix_claim_relations_to", "to_claim_id", "from_claim_id"),
     )
 
 
@@ -135,6 +288,7 @@ class DecisionOption(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     decision_id: Mapped[int] = mapped_column(ForeignKey("decisions.id"), nullable=False)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
+    description: Mapped[str | None] = mapped_column(Text, nullable=True)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
 
     decision: Mapped["Decision"] = relationship(back_populates="options")
@@ -143,6 +297,8 @@ class DecisionOption(Base):
         back_populates="option"
     )
 
+    __table_args__ = (Index("ix_decision_options_decision_id", "decision_id", "id"),)
+
 
 class DecisionClaimLink(Base):
     __tablename__ = "decision_claim_links"
@@ -162,4 +318,204 @@ class DecisionClaimLink(Base):
     option: Mapped["DecisionOption"] = relationship(back_populates="claim_links")
     claim: Mapped["Claim"] = relationship()
 
-    __table_args__ = (UniqueConstraint("option_id", "claim_id", "effect"),)
+    __table_args__ = (
+        UniqueConstraint("option_id", "claim_id", "effect"),
+        Index(
+            "ix_decision_claim_links_option",
+            "option_id",
+            "id",
+            postgresql_include=["claim_id", "effect", "weight"],
+        ),
+        Index("ix_decision_claim_links_claim", "claim_id", "option_id"),
+    )
+
+
+class OptionClaimCheck(Base):
+    """An (option, claim) pair the automatic linker has already scored."""
+
+    __tablename__ = "option_claim_checks"
+
+    option_id: Mapped[int] = mapped_column(
+        ForeignKey("decision_options.id", ondelete="CASCADE"), primary_key=True
+    )
+    claim_id: Mapped[int] = mapped_column(
+        ForeignKey("claims.id", ondelete="CASCADE"), primary_key=True
+    )
+
+    __table_args__ = (Index("ix_option_claim_checks_claim", "claim_id"),)
+
+
+class ExtractionCacheEntry(Base):
+    __tablename__ = "extraction_cache"
+
+    # sha256 of (key scheme version, model, prompt version, exact document text)
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    model: Mapped[str] = mapped_column(String(100), nullable=False)
+    prompt_version: Mapped[str] = mapped_column(String(32), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    hit_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    last_used_at = Column(
+        DateTime, server_default=func.now(), nullable=False, index=True
+    )
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    kind: Mapped[str] = mapped_column(String(50), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    result: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+
+    status: Mapped[JobStatus] = mapped_column(
+        SAEnum(JobStatus), default=JobStatus.queued, nullable=False
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=5, nullable=False)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    run_after = Column(DateTime, server_default=func.now(), nullable=False)
+    locked_at = Column(DateTime, nullable=True)
+    locked_by: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(
+        DateTime, server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+    __table_args__ = (Index("ix_jobs_status_run_after", "status", "run_after"),)
+
+
+class ConsultantReport(Base):
+    __tablename__ = "consultant_reports"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    decision_id: Mapped[int] = mapped_column(
+        ForeignKey("decisions.id", ondelete="CASCADE"), nullable=False
+    )
+    option_id: Mapped[int] = mapped_column(
+        ForeignKey("decision_options.id", ondelete="CASCADE"), nullable=False
+    )
+
+    # sha256 of everything the report was generated from
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    model: Mapped[str] = mapped_column(String(100), nullable=False)
+    prompt_version: Mapped[str] = mapped_column(String(32), nullable=False)
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("decision_id", "fingerprint"),
+        Index("ix_consultant_reports_decision_created", "decision_id", "created_at"),
+    )
+
+
+class GeminiUsage(Base):
+    """One Gemini request, for token and latency accounting."""
+
+    __tablename__ = "gemini_usage"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    decision_id: Mapped[int | None] = mapped_column(
+        ForeignKey("decisions.id", ondelete="SET NULL"), nullable=True
+    )
+    # What triggered the request (evaluate, ingest_document, ...) and what
+    # the prompt was for (extraction, report, ...).
+    endpoint: Mapped[str] = mapped_column(String(64), nullable=False)
+    purpose: Mapped[str] = mapped_column(String(32), nullable=False)
+    model: Mapped[str] = mapped_column(String(100), nullable=False)
+
+    estimated_tokens: Mapped[int] = mapped_column(Integer, nullable=False)
+    prompt_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    output_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    total_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    latency_ms: Mapped[float] = mapped_column(Float, nullable=False)
+    # Exception class name when the request failed.
+    error: Mapped[str | None] = mapped_column(String(100), nullable=True)
+
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_gemini_usage_decision_created", "decision_id", "created_at"),
+        Index("ix_gemini_usage_endpoint_created", "endpoint", "created_at"),
+    )
+
+
+class OptionScoreEntry(Base):
+    """Materialized score of one option, kept current by option_scores."""
+
+    __tablename__ = "option_scores"
+
+    option_id: Mapped[int] = mapped_column(
+        ForeignKey("decision_options.id", ondelete="CASCADE"), primary_key=True
+    )
+    decision_id: Mapped[int] = mapped_column(
+        ForeignKey("decisions.id", ondelete="CASCADE"), nullable=False
+    )
+    score: Mapped[float] = mapped_column(Float, nullable=False)
+
+    updated_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    __table_args__ = (Index("ix_option_scores_decision_score", "decision_id", "score"),)
+
+
+class ClaimMinhash(Base):
+    """MinHash signature of a claim, for near-duplicate lookups."""
+
+    __tablename__ = "claim_minhashes"
+
+    claim_id: Mapped[int] = mapped_column(
+        ForeignKey("claims.id", ondelete="CASCADE"), primary_key=True
+    )
+    # Decision of the claim's document, 0 when it has none; claims are only
+    # merged within one scope.
+    scope_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    signature: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+
+class ClaimLshBucket(Base):
+    __tablename__ = "claim_lsh_buckets"
+
+    scope_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    band: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    bucket: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    claim_id: Mapped[int] = mapped_column(
+        ForeignKey("claims.id", ondelete="CASCADE"), primary_key=True
+    )
+
+    __table_args__ = (Index("ix_claim_lsh_buckets_claim_id", "claim_id"),)
+
+
+class ClaimProvenance(Base):
+    """A near-duplicate claim that was merged into ``claim_id``."""
+
+    __tablename__ = "claim_provenance"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    claim_id: Mapped[int] = mapped_column(
+        ForeignKey("claims.id", ondelete="CASCADE"), nullable=False
+    )
+    document_id: Mapped[int] = mapped_column(
+        ForeignKey("documents.id", ondelete="CASCADE"), nullable=False
+    )
+
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    confidence: Mapped[float] = mapped_column(Float, nullable=False)
+    span_start: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    span_end: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    page_number: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # estimated Jaccard similarity to the canonical claim
+    similarity: Mapped[float] = mapped_column(Float, nullable=False)
+
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    claim: Mapped["Claim"] = relationship(back_populates="provenance")
+    document: Mapped["Document"] = relationship(back_populates="merged_claims")
+
+    __table_args__ = (
+        Index("ix_claim_provenance_claim_id", "claim_id"),
+        Index("ix_claim_provenance_document_id", "document_id"),
+    )
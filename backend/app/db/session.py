@@ -1,4 +1,6 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.lib.get_env import get_env_variable
 from dotenv import load_dotenv
@@ -16,11 +18,50 @@ load_dotenv()
 #         raise EnvironmentError(f"Gagal memuat variabel lingkungan wajib: {name}")
 
 
+def _flag(name: str, default: str) -> bool:
+    return get_env_variable(name, default).lower() in ("1", "true", "yes", "on")
+
+
 DATABASE_URL = get_env_variable("DATABASE_URL")
+# Defaults to DATABASE_URL on the asyncpg driver.
+ASYNC_DATABASE_URL = get_env_variable(
+    "ASYNC_DATABASE_URL",
+    make_url(DATABASE_URL)
+    .set(drivername="postgresql+asyncpg")
+    .render_as_string(hide_password=False),
+)
+
+SQL_ECHO = _flag("SQL_ECHO", "false")
+# Per process, the async pool (the API's read and evaluate paths) holds up
+# to POOL_SIZE + MAX_OVERFLOW connections and the sync pool (a few short API
+# routes, the worker's one session, scripts) up to SYNC_POOL_SIZE +
+# SYNC_MAX_OVERFLOW. Keep the sum times the process count under the
+# server's max_connections.
+POOL_SIZE = int(get_env_variable("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(get_env_variable("DB_MAX_OVERFLOW", "10"))
+SYNC_POOL_SIZE = int(get_env_variable("DB_SYNC_POOL_SIZE", "2"))
+SYNC_MAX_OVERFLOW = int(get_env_variable("DB_SYNC_MAX_OVERFLOW", "3"))
+POOL_TIMEOUT_SECONDS = float(get_env_variable("DB_POOL_TIMEOUT_SECONDS", "30"))
+POOL_RECYCLE_SECONDS = int(get_env_variable("DB_POOL_RECYCLE_SECONDS", "1800"))
+POOL_PRE_PING = _flag("DB_POOL_PRE_PING", "true")
+# Server-side cap per statement; 0 disables it.
+STATEMENT_TIMEOUT_MS = int(get_env_variable("DB_STATEMENT_TIMEOUT_MS", "30000"))
+
+_pool_options = dict(
+    echo=SQL_ECHO,
+    pool_timeout=POOL_TIMEOUT_SECONDS,
+    pool_recycle=POOL_RECYCLE_SECONDS,
+    pool_pre_ping=POOL_PRE_PING,
+)
+
+# Scripts (seed, backfill, the worker) keep the sync engine.
 engine = create_engine(
     DATABASE_URL,
-    echo=True,
     future=True,
+    connect_args={"options": f"-c statement_timeout={STATEMENT_TIMEOUT_MS}"},
+    pool_size=SYNC_POOL_SIZE,
+    max_overflow=SYNC_MAX_OVERFLOW,
+    **_pool_options,
 )
 
 SessionLocal = sessionmaker(
@@ -28,3 +69,22 @@ SessionLocal = sessionmaker(
     autoflush=False,
     bind=engine,
 )
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args={"server_settings": {"statement_timeout": str(STATEMENT_TIMEOUT_MS)}},
+    pool_size=POOL_SIZE,
+    max_overflow=MAX_OVERFLOW,
+    **_pool_options,
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# The option score listeners hook every Session. Importing them here keeps
+# scores current for anything that writes through these sessions, seed and
+# the dev scripts included, not only code that imports the scoring service.
+import app.domain.services.option_scores  # noqa: E402,F401
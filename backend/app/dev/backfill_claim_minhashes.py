@@ -0,0 +1,63 @@
+from sqlalchemy import exists, select
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.db.models import Claim, ClaimLshBucket, ClaimMinhash
+from app.domain.services.claim_dedup import (
+    CONTENT_BAND,
+    index_claims,
+    index_content_buckets,
+)
+
+BATCH_SIZE = 1000
+
+
+def backfill(db: Session):
+    """Index claims saved before near-duplicate detection, without merging them."""
+    total = 0
+    while True:
+        claims = db.scalars(
+            select(Claim)
+            .outerjoin(ClaimMinhash, ClaimMinhash.claim_id == Claim.id)
+            .where(ClaimMinhash.claim_id.is_(None))
+            .order_by(Claim.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not claims:
+            break
+
+        index_claims(db, claims)
+        db.commit()
+        total += len(claims)
+        print(f"   ... {total} claims indexed")
+
+    # Claims indexed before the content-word band was added.
+    has_content_bucket = exists().where(
+        ClaimLshBucket.claim_id == Claim.id, ClaimLshBucket.band == CONTENT_BAND
+    )
+    total = 0
+    while True:
+        claims = db.scalars(
+            select(Claim)
+            .join(ClaimMinhash, ClaimMinhash.claim_id == Claim.id)
+            .where(~has_content_bucket)
+            .order_by(Claim.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not claims:
+            break
+
+        index_content_buckets(db, claims)
+        db.commit()
+        total += len(claims)
+        print(f"   ... {total} content buckets added")
+
+    print("Backfill complete.")
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        backfill(db)
+    finally:
+        db.close()
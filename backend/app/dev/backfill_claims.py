@@ -0,0 +1,36 @@
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.db.models import Document
+from app.domain.services.document_processor import ingest_claims_for_documents
+
+BATCH_SIZE = 20
+
+
+def backfill(db: Session):
+    """Extract claims for documents uploaded before extraction moved to ingest."""
+    docs = (
+        db.query(Document)
+        .filter(~Document.claims.any(), ~Document.merged_claims.any())
+        .order_by(Document.id)
+        .all()
+    )
+    print(f"Backfilling claims for {len(docs)} documents...")
+
+    for i in range(0, len(docs), BATCH_SIZE):
+        batch = docs[i : i + BATCH_SIZE]
+        for doc_id, claims in ingest_claims_for_documents(db, batch).items():
+            if isinstance(claims, Exception):
+                print(f"   ... Document {doc_id} failed: {claims}")
+            else:
+                print(f"   ... Document {doc_id}: {len(claims)} claims")
+
+    print("Backfill complete.")
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        backfill(db)
+    finally:
+        db.close()
@@ -0,0 +1,44 @@
+import argparse
+import time
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.db.models import Decision
+from app.domain.services.relation_builder import (
+    MIN_SIMILARITY,
+    TOP_K,
+    build_relations_for_decision,
+)
+
+
+def build(db: Session, decision_ids: list[int], k: int, min_similarity: float):
+    """Propose supports/contradicts relations between similar claims."""
+    for decision_id in decision_ids:
+        started = time.perf_counter()
+        added = build_relations_for_decision(db, decision_id, k, min_similarity)
+        elapsed = time.perf_counter() - started
+        print(f"   ... Decision {decision_id}: {added} relations in {elapsed:.2f}s")
+
+    print("Relation build complete.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Infer claim relations from text similarity."
+    )
+    parser.add_argument("--decision-id", type=int, default=None)
+    parser.add_argument("--top-k", type=int, default=TOP_K)
+    parser.add_argument("--min-similarity", type=float, default=MIN_SIMILARITY)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.decision_id is not None:
+            decision_ids = [args.decision_id]
+        else:
+            decision_ids = db.scalars(select(Decision.id).order_by(Decision.id)).all()
+        build(db, decision_ids, args.top_k, args.min_similarity)
+    finally:
+        db.close()
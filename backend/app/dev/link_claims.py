@@ -0,0 +1,37 @@
+import argparse
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.db.models import Decision
+from app.domain.services.option_linker import (
+    MIN_SIMILARITY,
+    link_claims_for_decision,
+)
+
+
+def link(db: Session, decision_ids: list[int], min_similarity: float):
+    """Link claims not yet compared with each decision's options."""
+    for decision_id in decision_ids:
+        added = link_claims_for_decision(db, decision_id, min_similarity)
+        print(f"   ... Decision {decision_id}: {added} links")
+
+    print("Linking complete.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Link claims to decision options.")
+    parser.add_argument("--decision-id", type=int, default=None)
+    parser.add_argument("--min-similarity", type=float, default=MIN_SIMILARITY)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.decision_id is not None:
+            decision_ids = [args.decision_id]
+        else:
+            decision_ids = db.scalars(select(Decision.id).order_by(Decision.id)).all()
+        link(db, decision_ids, args.min_similarity)
+    finally:
+        db.close()
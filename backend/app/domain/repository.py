@@ -1,6 +1,52 @@
-from sqlalchemy.orm import Session, joinedload
+from typing import NamedTuple
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.compression import decompress_text
+from app.core.retrieval import Passage, split_passages
 from app.db import models
-from typing import List
+from app.core.scoring_engine import LinkRow, RelationRow
+
+# Keeps IN (...) lists well under driver/planner limits on big graphs.
+IN_CLAUSE_CHUNK = 10000
+
+
+class ClaimRow(NamedTuple):
+    document_id: int
+    text: str
+    confidence: float
+
+
+class DecisionGraph:
+    """Everything evaluate needs for one decision, as plain rows."""
+
+    __slots__ = (
+        "option_ids",
+        "links",
+        "relations",
+        "decision_doc_ids",
+        "document_hashes",
+        "claims_by_doc",
+    )
+
+    def __init__(
+        self,
+        option_ids: list[int],
+        links: list[LinkRow],
+        relations: list[RelationRow],
+        decision_doc_ids: list[int],
+        document_hashes: dict[int, str],
+        claims_by_doc: dict[int, list[ClaimRow]],
+    ):
+        self.option_ids = option_ids
+        self.links = links
+        self.relations = relations
+        self.decision_doc_ids = decision_doc_ids
+        # Only documents with extracted text, id -> sha256 of the text. The
+        # text itself stays compressed until a prompt needs it.
+        self.document_hashes = document_hashes
+        self.claims_by_doc = claims_by_doc
 
 
 class DecisionRepository:
@@ -14,27 +60,287 @@ class DecisionRepository:
             .all()
         )
 
-    def get_links_for_option(self, option_id: int) -> list[models.DecisionClaimLink]:
-        return (
-            self.db.query(models.DecisionClaimLink)
-            .options(
-                joinedload(models.DecisionClaimLink.claim)
-                .joinedload(models.Claim.outgoing_relations)
-                .joinedload(models.ClaimRelation.to_claim)
+    def _link_rows(self, where) -> list[LinkRow]:
+        rows = self.db.execute(
+            select(
+                models.DecisionClaimLink.option_id,
+                models.DecisionClaimLink.claim_id,
+                models.DecisionClaimLink.effect,
+                models.DecisionClaimLink.weight,
+                models.Claim.confidence,
+                models.Claim.text,
+                models.Claim.document_id,
             )
-            .filter(models.DecisionClaimLink.option_id == option_id)
-            .all()
+            .join(models.Claim, models.Claim.id == models.DecisionClaimLink.claim_id)
+            .join(
+                models.DecisionOption,
+                models.DecisionOption.id == models.DecisionClaimLink.option_id,
+            )
+            .where(where)
+            .order_by(models.DecisionClaimLink.option_id, models.DecisionClaimLink.id)
         )
+        return [
+            LinkRow(
+                option_id,
+                claim_id,
+                effect.value,
+                weight,
+                confidence,
+                text,
+                document_id,
+            )
+            for option_id, claim_id, effect, weight, confidence, text, document_id in rows
+        ]
+
+    def get_link_rows_for_decision(self, decision_id: int) -> list[LinkRow]:
+        return self._link_rows(models.DecisionOption.decision_id == decision_id)
+
+    def get_link_rows_for_options(self, option_ids) -> list[LinkRow]:
+        return self._link_rows(models.DecisionClaimLink.option_id.in_(list(option_ids)))
+
+    def get_upstream_claim_ids(self, claim_ids, max_depth: int) -> set[int]:
+        """``claim_ids`` plus every claim reaching them in ``max_depth`` hops."""
+        seen = set(claim_ids)
+        frontier = sorted(seen)
+
+        for _ in range(max_depth):
+            if not frontier:
+                break
 
-    def get_documents_for_option(self, option_id: int) -> List[str]:
-        links = self.get_links_for_option(option_id)
-        doc_ids = {link.claim.document_id for link in links if link.claim.document_id}
+            next_frontier = set()
+            for i in range(0, len(frontier), IN_CLAUSE_CHUNK):
+                from_ids = self.db.scalars(
+                    select(models.ClaimRelation.from_claim_id)
+                    .where(
+                        models.ClaimRelation.to_claim_id.in_(
+                            frontier[i : i + IN_CLAUSE_CHUNK]
+                        )
+                    )
+                    .distinct()
+                )
+                next_frontier.update(c for c in from_ids if c not in seen)
 
-        if not doc_ids:
+            seen.update(next_frontier)
+            frontier = sorted(next_frontier)
+
+        return seen
+
+    def get_option_ids_linked_to(self, claim_ids) -> set[int]:
+        claim_ids = sorted(claim_ids)
+        option_ids = set()
+        for i in range(0, len(claim_ids), IN_CLAUSE_CHUNK):
+            option_ids.update(
+                self.db.scalars(
+                    select(models.DecisionClaimLink.option_id)
+                    .where(
+                        models.DecisionClaimLink.claim_id.in_(
+                            claim_ids[i : i + IN_CLAUSE_CHUNK]
+                        )
+                    )
+                    .distinct()
+                )
+            )
+        return option_ids
+
+    def get_relation_rows_within(self, claim_ids, max_depth: int) -> list[RelationRow]:
+        """Relations reachable from ``claim_ids`` in at most ``max_depth`` hops."""
+        relations = []
+        seen = set(claim_ids)
+        frontier = sorted(seen)
+
+        for _ in range(max_depth):
+            if not frontier:
+                break
+
+            next_frontier = set()
+            for i in range(0, len(frontier), IN_CLAUSE_CHUNK):
+                rows = self.db.execute(
+                    select(
+                        models.ClaimRelation.from_claim_id,
+                        models.ClaimRelation.to_claim_id,
+                        models.ClaimRelation.relation_type,
+                        models.ClaimRelation.strength,
+                    ).where(
+                        models.ClaimRelation.from_claim_id.in_(
+                            frontier[i : i + IN_CLAUSE_CHUNK]
+                        )
+                    )
+                )
+                for from_id, to_id, relation_type, strength in rows:
+                    relations.append(
+                        RelationRow(from_id, to_id, relation_type.value, strength)
+                    )
+                    if to_id not in seen:
+                        seen.add(to_id)
+                        next_frontier.add(to_id)
+
+            frontier = sorted(next_frontier)
+
+        return relations
+
+    def load_decision_graph(self, decision_id: int, max_depth: int) -> DecisionGraph:
+        """Load a decision for scoring in a fixed number of queries.
+
+        One query each for options, links, documents and claims, plus one
+        per relation hop; none of them repeat per option.
+        """
+        option_ids = list(
+            self.db.scalars(
+                select(models.DecisionOption.id)
+                .where(models.DecisionOption.decision_id == decision_id)
+                .order_by(models.DecisionOption.id)
+            )
+        )
+        links = self.get_link_rows_for_decision(decision_id)
+        relations = self.get_relation_rows_within(
+            {link.claim_id for link in links}, max_depth
+        )
+
+        linked_doc_ids = sorted({l.document_id for l in links if l.document_id})
+        doc_rows = self.db.execute(
+            select(
+                models.Document.id,
+                models.Document.decision_id,
+                models.DocumentBody.sha256,
+                models.DocumentBody.char_count,
+            )
+            .outerjoin(models.DocumentBody)
+            .where(
+                or_(
+                    models.Document.decision_id == decision_id,
+                    models.Document.id.in_(linked_doc_ids),
+                )
+            )
+            .order_by(models.Document.id)
+        ).all()
+
+        decision_doc_ids = [
+            doc_id
+            for doc_id, doc_decision_id, _, _ in doc_rows
+            if doc_decision_id == decision_id
+        ]
+        document_hashes = {
+            doc_id: sha256 for doc_id, _, sha256, char_count in doc_rows if char_count
+        }
+
+        claims_by_doc = {doc_id: [] for doc_id in document_hashes}
+        if document_hashes:
+            rows = self.db.execute(
+                select(
+                    models.Claim.document_id,
+                    models.Claim.text,
+                    models.Claim.confidence,
+                )
+                .where(models.Claim.document_id.in_(list(document_hashes)))
+                .order_by(
+                    models.Claim.document_id, models.Claim.span_start, models.Claim.id
+                )
+            )
+            for row in rows:
+                claims_by_doc[row.document_id].append(ClaimRow(*row))
+
+        return DecisionGraph(
+            option_ids,
+            links,
+            relations,
+            decision_doc_ids,
+            document_hashes,
+            claims_by_doc,
+        )
+
+    def get_document_texts(self, document_ids: list[int]) -> list[str]:
+        """Decompressed texts of ``document_ids``, in the same order."""
+        if not document_ids:
             return []
+        rows = self.db.execute(
+            select(models.DocumentBody.document_id, models.DocumentBody.data).where(
+                models.DocumentBody.document_id.in_(document_ids)
+            )
+        )
+        texts = {doc_id: decompress_text(data) for doc_id, data in rows}
+        return [texts[doc_id] for doc_id in document_ids]
 
-        docs = (
-            self.db.query(models.Document).filter(models.Document.id.in_(doc_ids)).all()
+    def get_document_passages(self, document_ids: list[int]) -> list[Passage]:
+        """Report passages of ``document_ids``, page by page where pages exist."""
+        if not document_ids:
+            return []
+        rows = self.db.execute(
+            select(
+                models.DocumentPage.document_id,
+                models.DocumentPage.page_number,
+                models.DocumentPage.text,
+            )
+            .where(models.DocumentPage.document_id.in_(document_ids))
+            .order_by(models.DocumentPage.document_id, models.DocumentPage.page_number)
         )
+        pages = {}
+        for doc_id, page_number, text in rows:
+            pages.setdefault(doc_id, []).append((page_number, text))
+
+        # Documents stored before pages were kept only have a body.
+        unpaged = [doc_id for doc_id in document_ids if doc_id not in pages]
+        for doc_id, text in zip(unpaged, self.get_document_texts(unpaged)):
+            pages[doc_id] = [(None, text)]
+
+        return [
+            Passage(doc_id, page_number, passage)
+            for doc_id in document_ids
+            for page_number, text in pages[doc_id]
+            for passage in split_passages(text)
+        ]
 
-        return [doc.content for doc in docs if doc.content]
+
+class AsyncDecisionRepository:
+    """DecisionRepository for an AsyncSession.
+
+    Each method runs the sync query code through AsyncSession.run_sync, so
+    the I/O goes through the async driver without blocking the event loop
+    and the queries are defined only once.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _run(self, method, *args):
+        return await self.db.run_sync(
+            lambda session: method(DecisionRepository(session), *args)
+        )
+
+    async def get_options(self, decision_id: int) -> list[models.DecisionOption]:
+        return await self._run(DecisionRepository.get_options, decision_id)
+
+    async def get_link_rows_for_decision(self, decision_id: int) -> list[LinkRow]:
+        return await self._run(
+            DecisionRepository.get_link_rows_for_decision, decision_id
+        )
+
+    async def get_link_rows_for_options(self, option_ids) -> list[LinkRow]:
+        return await self._run(DecisionRepository.get_link_rows_for_options, option_ids)
+
+    async def get_upstream_claim_ids(self, claim_ids, max_depth: int) -> set[int]:
+        return await self._run(
+            DecisionRepository.get_upstream_claim_ids, claim_ids, max_depth
+        )
+
+    async def get_option_ids_linked_to(self, claim_ids) -> set[int]:
+        return await self._run(DecisionRepository.get_option_ids_linked_to, claim_ids)
+
+    async def get_relation_rows_within(
+        self, claim_ids, max_depth: int
+    ) -> list[RelationRow]:
+        return await self._run(
+            DecisionRepository.get_relation_rows_within, claim_ids, max_depth
+        )
+
+    async def get_document_texts(self, document_ids: list[int]) -> list[str]:
+        return await self._run(DecisionRepository.get_document_texts, document_ids)
+
+    async def get_document_passages(self, document_ids: list[int]) -> list[Passage]:
+        return await self._run(DecisionRepository.get_document_passages, document_ids)
+
+    async def load_decision_graph(
+        self, decision_id: int, max_depth: int
+    ) -> DecisionGraph:
+        return await self._run(
+            DecisionRepository.load_decision_graph, decision_id, max_depth
+        )
@@ -0,0 +1,253 @@
+import hashlib
+from collections import defaultdict
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.core import minhash
+from app.core.text_vectors import content_signature
+from app.db.models import (
+    Claim,
+    ClaimLshBucket,
+    ClaimMinhash,
+    ClaimProvenance,
+    Document,
+)
+from app.lib.get_env import get_env_variable
+
+# Estimated Jaccard similarity at or above which two claims are merged.
+# 16 bands of 8 rows put the LSH candidate threshold near 0.71.
+DEDUP_THRESHOLD = float(get_env_variable("CLAIM_DEDUP_THRESHOLD", "0.7"))
+# Share of content words two claims must have in common to be merged; one
+# word added to a three-word claim still passes, one swapped does not.
+MIN_WORD_OVERLAP = float(get_env_variable("CLAIM_DEDUP_MIN_WORD_OVERLAP", "0.75"))
+# One extra LSH band keyed on the content words, so restatements that
+# reorder a sentence ("costs drop after the migration" / "the migration
+# cuts costs") become candidates even when no shingle band matches.
+CONTENT_BAND = minhash.BANDS
+
+
+def _claim_text(claim: Claim) -> str:
+    return claim.normalized_text or claim.text
+
+
+def content_bucket(content: tuple) -> int:
+    """Bucket key of a claim's content words, for CONTENT_BAND."""
+    words = "\0".join(sorted(content[0]))
+    digest = hashlib.blake2b(words.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def _bucket_keys(sig, content: tuple) -> list[int]:
+    return minhash.band_keys(sig) + [content_bucket(content)]
+
+
+def merge_similarity(sig, content: tuple, other_sig, other_content: tuple):
+    """How alike two claims are, from 0 to 1, given their content_signature.
+
+    Restatements keep their numbers and direction, so a difference in either
+    rules a merge out. Otherwise the higher of the MinHash estimate and the
+    overlap of content words counts, as long as the words overlap by at
+    least MIN_WORD_OVERLAP: shingles miss a swapped synonym or a reordered
+    sentence, and on their own they cannot tell "churn" from "count".
+    """
+    words, numbers, direction = content
+    other_words, other_numbers, other_direction = other_content
+    if numbers != other_numbers or direction != other_direction:
+        return 0.0
+
+    union = words | other_words
+    overlap = len(words & other_words) / len(union) if union else 1.0
+    if overlap < MIN_WORD_OVERLAP:
+        return 0.0
+    return max(minhash.similarity(sig, other_sig), overlap)
+
+
+def _scopes(db: Session, document_ids) -> dict[int, int]:
+    rows = db.execute(
+        select(Document.id, Document.decision_id).where(
+            Document.id.in_(list(document_ids))
+        )
+    )
+    return {doc_id: decision_id or 0 for doc_id, decision_id in rows}
+
+
+def _index_rows(claim_id: int, scope_id: int, sig, keys: list[int]):
+    minhash_row = {
+        "claim_id": claim_id,
+        "scope_id": scope_id,
+        "signature": minhash.to_bytes(sig),
+    }
+    bucket_rows = [
+        {"scope_id": scope_id, "band": band, "bucket": key, "claim_id": claim_id}
+        for band, key in enumerate(keys)
+    ]
+    return minhash_row, bucket_rows
+
+
+def _write_index(db: Session, minhash_rows: list[dict], bucket_rows: list[dict]):
+    if minhash_rows:
+        db.execute(insert(ClaimMinhash), minhash_rows)
+        db.execute(insert(ClaimLshBucket), bucket_rows)
+
+
+def merge_new_claims(db: Session, claims: list[Claim]) -> list[Claim]:
+    """Add new ``claims`` to the session, folding near-duplicates together.
+
+    A claim whose merge_similarity to an earlier claim of the same decision
+    reaches DEDUP_THRESHOLD is not inserted; it is recorded as a
+    ClaimProvenance row on that canonical claim instead. Candidates come
+    from one indexed LSH bucket lookup for the whole batch, so the cost per
+    claim does not grow with the number of stored claims. Returns the
+    canonical claim for each input, in order. Does not commit.
+    """
+    if not claims:
+        return []
+
+    scopes = _scopes(db, {claim.document_id for claim in claims})
+    texts = [_claim_text(claim) for claim in claims]
+    sigs = [minhash.signature(text) for text in texts]
+    contents = [content_signature(text) for text in texts]
+    keys = [_bucket_keys(sig, content) for sig, content in zip(sigs, contents)]
+
+    keys_by_scope = defaultdict(set)
+    for claim, claim_keys in zip(claims, keys):
+        keys_by_scope[scopes[claim.document_id]].update(claim_keys)
+
+    stored_buckets = defaultdict(set)
+    for scope_id, scope_keys in keys_by_scope.items():
+        rows = db.execute(
+            select(
+                ClaimLshBucket.band, ClaimLshBucket.bucket, ClaimLshBucket.claim_id
+            ).where(
+                ClaimLshBucket.scope_id == scope_id,
+                ClaimLshBucket.bucket.in_(list(scope_keys)),
+            )
+        )
+        for band, bucket, claim_id in rows:
+            stored_buckets[(scope_id, band, bucket)].add(claim_id)
+
+    candidate_ids = set().union(*stored_buckets.values())
+    stored = {}
+    if candidate_ids:
+        rows = db.execute(
+            select(
+                ClaimMinhash.claim_id,
+                ClaimMinhash.signature,
+                Claim.text,
+                Claim.normalized_text,
+            )
+            .join(Claim, Claim.id == ClaimMinhash.claim_id)
+            .where(ClaimMinhash.claim_id.in_(list(candidate_ids)))
+        )
+        stored = {
+            claim_id: (
+                minhash.from_bytes(sig),
+                content_signature(normalized_text or text),
+            )
+            for claim_id, sig, text, normalized_text in rows
+        }
+
+    canonical = []
+    # (claim, scope_id, sig, keys, content) of claims inserted in this batch
+    kept = []
+    batch_buckets = defaultdict(list)
+
+    for claim, sig, claim_keys, content in zip(claims, sigs, keys, contents):
+        scope_id = scopes[claim.document_id]
+        best, best_similarity = None, DEDUP_THRESHOLD
+        seen = set()
+
+        for band, key in enumerate(claim_keys):
+            bucket = (scope_id, band, key)
+            for claim_id in stored_buckets.get(bucket, ()):
+                if ("stored", claim_id) in seen:
+                    continue
+                seen.add(("stored", claim_id))
+                similarity = merge_similarity(sig, content, *stored[claim_id])
+                if similarity >= best_similarity:
+                    best, best_similarity = ("stored", claim_id), similarity
+            for i in batch_buckets.get(bucket, ()):
+                if ("batch", i) in seen:
+                    continue
+                seen.add(("batch", i))
+                _, _, other_sig, _, other_content = kept[i]
+                similarity = merge_similarity(sig, content, other_sig, other_content)
+                if similarity >= best_similarity:
+                    best, best_similarity = ("batch", i), similarity
+
+        if best is None:
+            db.add(claim)
+            for band, key in enumerate(claim_keys):
+                batch_buckets[(scope_id, band, key)].append(len(kept))
+            kept.append((claim, scope_id, sig, claim_keys, content))
+            canonical.append(claim)
+            continue
+
+        kind, ref = best
+        target = db.get(Claim, ref) if kind == "stored" else kept[ref][0]
+        db.add(
+            ClaimProvenance(
+                claim=target,
+                document_id=claim.document_id,
+                text=claim.text,
+                confidence=claim.confidence,
+                span_start=claim.span_start,
+                span_end=claim.span_end,
+                page_number=claim.page_number,
+                similarity=best_similarity,
+            )
+        )
+        canonical.append(target)
+
+    # Ids for the kept claims, then their signatures and buckets in bulk.
+    db.flush()
+    minhash_rows, bucket_rows = [], []
+    for claim, scope_id, sig, claim_keys, _ in kept:
+        row, buckets = _index_rows(claim.id, scope_id, sig, claim_keys)
+        minhash_rows.append(row)
+        bucket_rows.extend(buckets)
+    _write_index(db, minhash_rows, bucket_rows)
+
+    return canonical
+
+
+def index_claims(db: Session, claims: list[Claim]):
+    """Store signatures for already-saved claims without merging them."""
+    if not claims:
+        return
+
+    scopes = _scopes(db, {claim.document_id for claim in claims})
+    minhash_rows, bucket_rows = [], []
+    for claim in claims:
+        text = _claim_text(claim)
+        sig = minhash.signature(text)
+        row, buckets = _index_rows(
+            claim.id,
+            scopes[claim.document_id],
+            sig,
+            _bucket_keys(sig, content_signature(text)),
+        )
+        minhash_rows.append(row)
+        bucket_rows.extend(buckets)
+    _write_index(db, minhash_rows, bucket_rows)
+
+
+def index_content_buckets(db: Session, claims: list[Claim]):
+    """Add the CONTENT_BAND bucket for claims indexed before it existed."""
+    if not claims:
+        return
+
+    scopes = _scopes(db, {claim.document_id for claim in claims})
+    db.execute(
+        insert(ClaimLshBucket),
+        [
+            {
+                "scope_id": scopes[claim.document_id],
+                "band": CONTENT_BAND,
+                "bucket": content_bucket(content_signature(_claim_text(claim))),
+                "claim_id": claim.id,
+            }
+            for claim in claims
+        ],
+    )
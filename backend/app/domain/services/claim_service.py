@@ -1,22 +1,102 @@
 from sqlalchemy.orm import Session
-from app.db.models import Claim, Document
-from app.core.gemini import extract_claims_from_text
+from app.db.models import Claim, ClaimType, Document
+from app.core.gemini import GeminiClaimsOutput
+from app.core.pdf import page_for_offset
+from app.domain.services.claim_dedup import merge_new_claims
+from app.domain.services.extraction_cache import (
+    extract_claims_cached,
+    extract_claims_many,
+)
 
+# Gemini labels claims FACT|OPINION|INFERENCE, the schema uses ClaimType.
+GEMINI_CLAIM_TYPES = {
+    "FACT": ClaimType.empirical,
+    "OPINION": ClaimType.opinion,
+    "INFERENCE": ClaimType.theoretical,
+}
+
+
+def to_claim_type(value: str) -> ClaimType:
+    return GEMINI_CLAIM_TYPES.get(value.strip().upper(), ClaimType.empirical)
 
-def add_claims_from_text(db: Session, document_id: int, text: str):
-    output = extract_claims_from_text(text)
 
-    claims = []
-    for c in output.claims:
-        claim = Claim(
+def _build_claims(
+    document_id: int, output: GeminiClaimsOutput, page_starts: list[int] = ()
+) -> list[Claim]:
+    return [
+        Claim(
             text=c.claim_text,
             normalized_text=c.normalized_text,
             confidence=c.confidence,
+            claim_type=to_claim_type(c.claim_type),
+            span_start=c.span_start,
+            span_end=c.span_end,
+            page_number=page_for_offset(page_starts, c.span_start),
+            document_id=document_id,
+        )
+        for c in output.claims
+    ]
+
+
+def clone_claims(claims: list[Claim], document_id: int) -> list[Claim]:
+    """Copy claims onto another document holding the same text."""
+    return [
+        Claim(
+            text=c.text,
+            normalized_text=c.normalized_text,
+            confidence=c.confidence,
             claim_type=c.claim_type,
+            scope=c.scope,
+            span_start=c.span_start,
+            span_end=c.span_end,
+            page_number=c.page_number,
             document_id=document_id,
         )
-        db.add(claim)
-        claims.append(claim)
+        for c in claims
+    ]
+
+
+def _unique(claims: list[Claim]) -> list[Claim]:
+    return list({id(claim): claim for claim in claims}.values())
+
+
+def add_claims_from_text(db: Session, document_id: int, text: str):
+    output = extract_claims_cached(db, text)
+
+    # Restatements of claims already stored for the decision are merged
+    # into them, so this returns the canonical claims.
+    claims = _unique(merge_new_claims(db, _build_claims(document_id, output)))
 
     db.commit()
     return claims
+
+
+def add_claims_for_documents(
+    db: Session, documents: list[Document]
+) -> dict[int, list[Claim] | Exception]:
+    """Extract and save claims for several documents in as few prompts as possible."""
+    outputs = extract_claims_many(db, {str(doc.id): doc.content for doc in documents})
+
+    results = {}
+    new_claims = []
+    for doc in documents:
+        output = outputs[str(doc.id)]
+        if isinstance(output, Exception):
+            results[doc.id] = output
+            continue
+
+        new_claims.extend(
+            _build_claims(doc.id, output, [page.char_start for page in doc.pages])
+        )
+        results[doc.id] = []
+
+    # One dedup pass for the batch, so overlapping documents merge too.
+    canonical = merge_new_claims(db, new_claims)
+    for claim, target in zip(new_claims, canonical):
+        results[claim.document_id].append(target)
+
+    db.commit()
+    return {
+        doc_id: claims if isinstance(claims, Exception) else _unique(claims)
+        for doc_id, claims in results.items()
+    }
@@ -1,17 +1,44 @@
-from typing import List
-from dataclasses import dataclass
-from sqlalchemy.orm import Session
-import time
-import random
+import logging
+from typing import Iterator, List
+from dataclasses import asdict, dataclass, field
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import Document
-from app.domain.repository import DecisionRepository
-from app.core.scoring import score_option_with_propagation
-from app.core.gemini import extract_claims_from_text
+from app.domain.repository import AsyncDecisionRepository, DecisionGraph
+from app.core.scoring_engine import link_reasons
+from app.core.gemini import (
+    EMPTY_REPORT_TEXT,
+    REPORT_CONTEXT_TOKENS,
+    UsageCollector,
+    estimate_tokens,
+    generate_consultant_report_async,
+    iter_with_usage,
+    stream_consultant_report_async,
+    track_usage,
+)
+from app.core.resilience import CircuitOpenError
+from app.core.retrieval import Passage, select_passages
+from app.domain.services.gemini_usage import save_usage
+from app.domain.services.option_scores import get_option_scores
+from app.domain.services.report_service import (
+    get_latest_report,
+    get_stored_report,
+    report_fingerprint,
+    save_report,
+)
 
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
-from app.core.gemini import extract_claims_from_text, generate_consultant_report
+logger = logging.getLogger(__name__)
+
+REPORT_UNAVAILABLE_TEXT = (
+    "## Report Temporarily Unavailable\n\n"
+    "The AI service is currently degraded, so the consultant report "
+    "was skipped. The option rankings above are complete; try again "
+    "in a minute for the full report."
+)
+
+STALE_REPORT_NOTE = (
+    "> The AI service is currently degraded. This is the last stored report "
+    "for this decision and may not reflect the latest evidence.\n\n"
+)
 
 
 @dataclass
@@ -27,95 +54,235 @@ class DecisionResult:
     ranked_options: List[OptionScore]
 
 
-def gemini_worker(doc_text, retries=3):
-    attempt = 0
-    while attempt < retries:
-        try:
-            output = extract_claims_from_text(doc_text)
-            return [(c.claim_text[:80], c.confidence) for c in output.claims]
-
-        except Exception as e:
-            error_str = str(e)
-
-            if any(
-                code in error_str
-                for code in ["429", "503", "RESOURCE_EXHAUSTED", "UNAVAILABLE"]
-            ):
-                attempt += 1
-                if attempt >= retries:
-                    return f"GEMINI ERROR: Failed after {retries} retries. Last error: {error_str}"
-
-                wait_time = (2**attempt) * 2 + random.uniform(0, 1)
-                print(
-                    f"Gemini busy/limited (Error {error_str[:3]}). Retrying in {wait_time:.2f}s..."
-                )
-                time.sleep(wait_time)
-            else:
-                return f"GEMINI ERROR: {error_str}"
+@dataclass
+class EvaluationState:
+    """The loaded decision graph, shared by every option."""
 
-    return "GEMINI ERROR: Failed for unknown reasons"
+    graph: DecisionGraph | None = None
+    option_doc_ids: dict[int, list[int]] = field(default_factory=dict)
 
 
-async def evaluate_decision(decision_id: int, db: Session):
-    repo = DecisionRepository(db)
-    options = repo.get_options(decision_id)
+async def load_evaluation(
+    db: AsyncSession, decision_id: int, state: EvaluationState
+) -> dict[int, float]:
+    """Load the decision into ``state`` and return its stored option scores."""
+    # Scores are maintained in option_scores, so the claim graph beyond the
+    # links themselves is not needed here.
+    graph = await AsyncDecisionRepository(db).load_decision_graph(
+        decision_id, max_depth=0
+    )
+    state.graph = graph
+    scores = await db.run_sync(get_option_scores, decision_id, graph.option_ids)
+    # Keep any scores computed for options that had none stored.
+    await db.commit()
+    return scores
 
-    decision_docs = db.query(Document).filter(Document.decision_id == decision_id).all()
-    decision_doc_texts = [d.content for d in decision_docs]
 
-    results = []
+def iter_option_scores(
+    state: EvaluationState, scores: dict[int, float]
+) -> Iterator[OptionScore]:
+    """Hand out each option's score with its evidence, one at a time."""
+    graph = state.graph
+    reasons_by_option = link_reasons(graph.links)
 
-    loop = asyncio.get_running_loop()
-    executor = ThreadPoolExecutor(max_workers=4)
+    doc_ids_by_option = {option_id: set() for option_id in graph.option_ids}
+    for link in graph.links:
+        if link.document_id:
+            doc_ids_by_option[link.option_id].add(link.document_id)
 
-    for option in options:
-        links = repo.get_links_for_option(option.id)
-        score, reasons = score_option_with_propagation(links)
+    for option_id in graph.option_ids:
+        score = scores[option_id]
+        reasons = list(reasons_by_option.get(option_id, []))
 
-        option_doc_texts = repo.get_documents_for_option(option.id)
+        option_doc_ids = sorted(doc_ids_by_option[option_id])
+        doc_ids = option_doc_ids + [
+            doc_id for doc_id in graph.decision_doc_ids if doc_id not in option_doc_ids
+        ]
+        doc_ids = [doc_id for doc_id in doc_ids if doc_id in graph.document_hashes]
+        state.option_doc_ids[option_id] = doc_ids
 
-        all_texts_to_check = option_doc_texts + decision_doc_texts
+        for doc_id in doc_ids:
+            for c in graph.claims_by_doc[doc_id]:
+                reasons.append(f"GEMINI: {c.text[:80]}... => {c.confidence:.3f}")
 
-        tasks = [
-            loop.run_in_executor(executor, gemini_worker, doc_text)
-            for doc_text in all_texts_to_check
-        ]
+        yield OptionScore(option_id=option_id, score=score, reasons=reasons)
 
-        gemini_results = await asyncio.gather(*tasks)
 
-        for result in gemini_results:
-            if isinstance(result, list):
-                for claim_text, conf in result:
-                    reasons.append(f"GEMINI: {claim_text}... => {conf:.3f}")
-            else:
-                reasons.append(result)
+def report_context_ids(state: EvaluationState, option_id: int) -> list[int]:
+    graph = state.graph
+    option_doc_ids = state.option_doc_ids[option_id]
+    return [i for i in graph.decision_doc_ids if i in option_doc_ids] + [
+        i for i in option_doc_ids if i not in graph.decision_doc_ids
+    ]
+
+
+def report_fingerprint_for(state: EvaluationState, winner: OptionScore) -> str:
+    context_ids = report_context_ids(state, winner.option_id)
+    return report_fingerprint(
+        winner.option_id,
+        winner.score,
+        winner.reasons,
+        [state.graph.document_hashes[doc_id] for doc_id in context_ids],
+    )
 
-        results.append(OptionScore(option_id=option.id, score=score, reasons=reasons))
-        pass
 
+def report_queries(state: EvaluationState, option_id: int) -> list[str]:
+    """Texts of the claims behind the option, to retrieve report passages by."""
+    links = [link for link in state.graph.links if link.option_id == option_id]
+    texts = [link.text for link in links if link.effect == "supports"] or [
+        link.text for link in links
+    ]
+    if texts:
+        return texts
+    return [
+        claim.text
+        for doc_id in state.option_doc_ids[option_id]
+        for claim in state.graph.claims_by_doc[doc_id]
+    ]
+
+
+async def load_report_context(
+    db: AsyncSession, state: EvaluationState, option_id: int
+) -> list[Passage]:
+    # The only place document text is read on the evaluate path.
+    passages = await AsyncDecisionRepository(db).get_document_passages(
+        report_context_ids(state, option_id)
+    )
+    return select_passages(
+        passages,
+        report_queries(state, option_id),
+        REPORT_CONTEXT_TOKENS,
+        estimate_tokens,
+    )
+
+
+async def degraded_report(db: AsyncSession, decision_id: int) -> str:
+    latest = await db.run_sync(get_latest_report, decision_id)
+    if latest is None:
+        return REPORT_UNAVAILABLE_TEXT
+    return STALE_REPORT_NOTE + latest.content
+
+
+async def evaluate_decision(decision_id: int, db: AsyncSession, refresh: bool = False):
+    state = EvaluationState()
+    scores = await load_evaluation(db, decision_id, state)
+    results = list(iter_option_scores(state, scores))
     results.sort(key=lambda x: x.score, reverse=True)
 
     consultant_report = ""
 
     if results:
         winner = results[0]
-        print(f"Generating Consultant Report for winner: Option {winner.option_id}...")
-
-        winner_option_docs = repo.get_documents_for_option(winner.option_id)
-        all_context = decision_doc_texts + winner_option_docs
+        fingerprint = report_fingerprint_for(state, winner)
+        stored = (
+            None
+            if refresh
+            else await db.run_sync(get_stored_report, decision_id, fingerprint)
+        )
 
-        try:
-            consultant_report = generate_consultant_report(
-                winning_option_name=f"Option {winner.option_id}",
-                winning_score=winner.score,
-                engine_reasons=winner.reasons,
-                all_document_texts=all_context,
+        if stored is not None:
+            consultant_report = stored.content
+        else:
+            logger.info(
+                "Generating consultant report for decision %s, winner option %s",
+                decision_id,
+                winner.option_id,
             )
-        except Exception as e:
-            consultant_report = f"Error generating report: {str(e)}"
+            context = await load_report_context(db, state, winner.option_id)
+            endpoint = "report_refresh" if refresh else "evaluate"
+            with track_usage(endpoint, decision_id) as usage:
+                try:
+                    consultant_report = await generate_consultant_report_async(
+                        winning_option_name=f"Option {winner.option_id}",
+                        winning_score=winner.score,
+                        engine_reasons=winner.reasons,
+                        passages=context,
+                    )
+                    if consultant_report != EMPTY_REPORT_TEXT:
+                        await db.run_sync(
+                            save_report,
+                            decision_id,
+                            winner.option_id,
+                            fingerprint,
+                            consultant_report,
+                        )
+                except CircuitOpenError:
+                    # Gemini is failing right now: return the rankings without
+                    # waiting on a report that would only time out.
+                    consultant_report = await degraded_report(db, decision_id)
+                except Exception as e:
+                    consultant_report = f"Error generating report: {str(e)}"
+            await db.run_sync(save_usage, usage)
 
     return {
         "decision_id": decision_id,
         "ranked_options": results,
         "consultant_report": consultant_report,
     }
+
+
+async def iter_evaluation_events(
+    decision_id: int, db: AsyncSession, refresh: bool = False
+):
+    """Yield (event, data) pairs for the streaming evaluate endpoint.
+
+    Each option is sent as soon as it is scored, then the ranking, then the
+    consultant report in chunks as Gemini writes it, then "done".
+    """
+    state = EvaluationState()
+    scores = await load_evaluation(db, decision_id, state)
+    results = []
+
+    for option_score in iter_option_scores(state, scores):
+        results.append(option_score)
+        yield "option", asdict(option_score)
+
+    results.sort(key=lambda x: x.score, reverse=True)
+    yield "ranking", {
+        "decision_id": decision_id,
+        "ranked_option_ids": [r.option_id for r in results],
+    }
+
+    if results:
+        winner = results[0]
+        fingerprint = report_fingerprint_for(state, winner)
+        stored = (
+            None
+            if refresh
+            else await db.run_sync(get_stored_report, decision_id, fingerprint)
+        )
+
+        if stored is not None:
+            yield "report", {"text": stored.content}
+        else:
+            context = await load_report_context(db, state, winner.option_id)
+            parts = []
+            # Not track_usage: this generator yields between Gemini calls.
+            usage = UsageCollector("evaluate_stream", decision_id)
+            report_stream = stream_consultant_report_async(
+                winning_option_name=f"Option {winner.option_id}",
+                winning_score=winner.score,
+                engine_reasons=winner.reasons,
+                passages=context,
+            )
+            try:
+                async for text in iter_with_usage(report_stream, usage):
+                    parts.append(text)
+                    yield "report", {"text": text}
+            except CircuitOpenError:
+                yield "report", {"text": await degraded_report(db, decision_id)}
+            except Exception as e:
+                yield "report", {"text": f"Error generating report: {str(e)}"}
+            else:
+                report = "".join(parts)
+                if report != EMPTY_REPORT_TEXT:
+                    await db.run_sync(
+                        save_report,
+                        decision_id,
+                        winner.option_id,
+                        fingerprint,
+                        report,
+                    )
+            await db.run_sync(save_usage, usage)
+
+    yield "done", {"decision_id": decision_id}
@@ -1,34 +1,184 @@
+import hashlib
+import logging
 import os
-import shutil
+import uuid
+from dataclasses import dataclass
 from fastapi import UploadFile
-from pdfminer.high_level import extract_text
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.db.models import Document
+from app.core.pdf import layout_pages, pdf_extractor
+from app.core.compression import text_sha256
+from app.db.models import Document, DocumentBody, DocumentPage
+from app.domain.services.claim_dedup import merge_new_claims
+from app.domain.services.claim_service import add_claims_for_documents, clone_claims
+from app.lib.get_env import get_env_variable
+
+logger = logging.getLogger(__name__)
 
 UPLOAD_DIR = "storage/pdfs"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+MAX_UPLOAD_BYTES = int(get_env_variable("MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+
+EXTRACTION_FAILED_TEXT = "Error extraction text from PDF."
+
+
+class UploadTooLargeError(ValueError):
+    pass
+
+
+@dataclass
+class StoredUpload:
+    file_location: str
+    content_sha256: str
+    size: int
+
 
-def process_and_save_document(db: Session, file: UploadFile, decision_id: int):
-    file_location = f"{UPLOAD_DIR}/{file.filename}"
+def upload_path(content_sha256: str) -> str:
+    return f"{UPLOAD_DIR}/{content_sha256[:2]}/{content_sha256}.pdf"
 
-    with open(file_location, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+
+def save_upload(file: UploadFile) -> StoredUpload:
+    """Stream an upload to disk under its SHA-256.
+
+    The file is hashed while it is copied in fixed-size chunks, so it is
+    read once and never held in memory. Identical files share one stored
+    copy; uploads over MAX_UPLOAD_BYTES raise UploadTooLargeError.
+    """
+    temp_location = f"{UPLOAD_DIR}/.upload-{uuid.uuid4().hex}"
+    digest = hashlib.sha256()
+    size = 0
 
     try:
-        text_content = extract_text(file_location)
-    except Exception as e:
-        print(f"Extraction failed: {e}")
-        text_content = "Error extraction text from PDF."
-
-    db_doc = Document(
-        title=file.filename,
-        source="upload",
-        content=text_content,
-        decision_id=decision_id,
+        with open(temp_location, "wb") as buffer:
+            while chunk := file.file.read(UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise UploadTooLargeError(
+                        f"Upload exceeds the {MAX_UPLOAD_BYTES} byte limit."
+                    )
+                digest.update(chunk)
+                buffer.write(chunk)
+
+        content_sha256 = digest.hexdigest()
+        file_location = upload_path(content_sha256)
+        if os.path.exists(file_location):
+            os.remove(temp_location)
+        else:
+            os.makedirs(os.path.dirname(file_location), exist_ok=True)
+            os.replace(temp_location, file_location)
+    except BaseException:
+        if os.path.exists(temp_location):
+            os.remove(temp_location)
+        raise
+
+    return StoredUpload(file_location, content_sha256, size)
+
+
+def find_extracted_document(
+    db: Session, content_sha256: str, decision_id: int | None = None
+) -> Document | None:
+    """An earlier document with the same file whose text extraction worked."""
+    query = (
+        select(Document)
+        .join(DocumentBody)
+        .where(
+            Document.content_sha256 == content_sha256,
+            DocumentBody.sha256 != text_sha256(EXTRACTION_FAILED_TEXT),
+        )
     )
-    db.add(db_doc)
-    db.commit()
-    db.refresh(db_doc)
+    if decision_id is not None:
+        query = query.where(Document.decision_id == decision_id)
+    return db.scalars(query.order_by(Document.id).limit(1)).first()
+
+
+def _page_records(pages) -> list[DocumentPage]:
+    return [
+        DocumentPage(
+            page_number=p.page_number,
+            char_start=p.char_start,
+            char_end=p.char_end,
+            text=p.text,
+        )
+        for p in pages
+    ]
+
+
+def ingest_document(
+    db: Session,
+    file_location: str,
+    title: str,
+    decision_id: int | None,
+    document_id: int | None = None,
+    content_sha256: str | None = None,
+) -> Document:
+    """Extract text and claims for an uploaded file.
+
+    Pass ``document_id`` when retrying so the document row created by an
+    earlier attempt is reused instead of duplicated. A file already
+    uploaded to the same decision returns that document; one uploaded
+    elsewhere is copied with its text and claims, so nothing is extracted.
+    """
+    db_doc = db.get(Document, document_id) if document_id else None
+
+    if db_doc is None and content_sha256 and decision_id is not None:
+        db_doc = find_extracted_document(db, content_sha256, decision_id)
+
+    if db_doc is None:
+        source = find_extracted_document(db, content_sha256) if content_sha256 else None
+        if source is not None:
+            text_content = source.content
+            pages = _page_records(source.pages)
+        else:
+            try:
+                # pdfminer runs in the extractor's process pool, so a bad
+                # PDF times out or hits its memory cap there, not here.
+                # Pages are laid out as they arrive.
+                text_content, layout = layout_pages(
+                    pdf_extractor.iter_pages(file_location)
+                )
+                pages = _page_records(layout)
+            except Exception:
+                logger.exception("Extraction failed for %s", file_location)
+                text_content = EXTRACTION_FAILED_TEXT
+                pages = []
+
+        db_doc = Document(
+            title=title,
+            source="upload",
+            content=text_content,
+            content_sha256=content_sha256,
+            decision_id=decision_id,
+            pages=pages,
+        )
+        db.add(db_doc)
+        db.flush()
+        if source is not None:
+            merge_new_claims(db, clone_claims(source.claims, db_doc.id))
+        db.commit()
+        db.refresh(db_doc)
 
     return db_doc
+
+
+def ingest_claims_for_documents(db: Session, docs: list[Document]) -> dict:
+    # Claims are extracted once here so evaluation only has to read them.
+    results = {}
+    pending = []
+    for db_doc in docs:
+        if (
+            db_doc.claims
+            or db_doc.merged_claims
+            or db_doc.content == EXTRACTION_FAILED_TEXT
+        ):
+            results[db_doc.id] = db_doc.claims
+        elif not db_doc.content.strip():
+            results[db_doc.id] = []
+        else:
+            pending.append(db_doc)
+
+    if pending:
+        results.update(add_claims_for_documents(db, pending))
+
+    return results
@@ -0,0 +1,233 @@
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.core.gemini import (
+    EXTRACTION_MODEL,
+    EXTRACTION_PROMPT_VERSION,
+    GeminiClaimsOutput,
+    extract_claims_from_text,
+    extract_claims_many_async,
+)
+from app.db.models import ExtractionCacheEntry
+from app.lib.get_env import get_env_variable
+
+CACHE_TTL_SECONDS = int(get_env_variable("EXTRACTION_CACHE_TTL_SECONDS", "2592000"))
+CACHE_MAX_ROWS = int(get_env_variable("EXTRACTION_CACHE_MAX_ROWS", "50000"))
+LRU_MAX_ITEMS = int(get_env_variable("EXTRACTION_CACHE_LRU_SIZE", "256"))
+
+# Size eviction walks the whole table, so only run it every N writes.
+EVICT_EVERY_N_WRITES = 100
+
+
+# Cached claims carry span_start/span_end into the text they were extracted
+# from, so entries are keyed on that exact text: any normalization here would
+# hand one text's offsets to another. Bumped when the key scheme changes, so
+# entries written under an older scheme are never hit.
+CACHE_KEY_VERSION = "exact-v1"
+
+
+def cache_key(
+    text: str,
+    model: str = EXTRACTION_MODEL,
+    prompt_version: str = EXTRACTION_PROMPT_VERSION,
+) -> str:
+    h = hashlib.sha256()
+    for part in (CACHE_KEY_VERSION, model, prompt_version):
+        h.update(part.encode())
+        h.update(b"\0")
+    h.update(text.encode())
+    return h.hexdigest()
+
+
+class _LRUCache:
+    def __init__(self, max_items: int, ttl_seconds: int):
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self._items: OrderedDict[str, tuple[float, GeminiClaimsOutput]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> GeminiClaimsOutput | None:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._items[key]
+                return None
+
+            self._items.move_to_end(key)
+            return value
+
+    def put(
+        self, key: str, value: GeminiClaimsOutput, ttl_seconds: float | None = None
+    ):
+        if ttl_seconds is None:
+            ttl_seconds = self.ttl_seconds
+        with self._lock:
+            self._items[key] = (time.monotonic() + ttl_seconds, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def discard(self, key: str):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+_lru = _LRUCache(LRU_MAX_ITEMS, CACHE_TTL_SECONDS)
+_writes_since_evict = 0
+
+
+def get_cached_claims(db: Session, text: str) -> GeminiClaimsOutput | None:
+    """Cached extraction for ``text``, or None.
+
+    A database hit bumps the entry's hit count; the caller commits it.
+    """
+    key = cache_key(text)
+
+    cached = _lru.get(key)
+    if cached is not None:
+        return cached
+
+    entry = db.get(ExtractionCacheEntry, key)
+    if entry is None:
+        return None
+
+    now = datetime.utcnow()
+    ttl_left = (
+        entry.created_at + timedelta(seconds=CACHE_TTL_SECONDS) - now
+    ).total_seconds()
+    if ttl_left <= 0:
+        return None
+
+    output = GeminiClaimsOutput.parse_obj(entry.payload)
+
+    db.execute(
+        update(ExtractionCacheEntry)
+        .where(ExtractionCacheEntry.cache_key == key)
+        .values(
+            hit_count=ExtractionCacheEntry.hit_count + 1,
+            last_used_at=now,
+        )
+    )
+
+    # The entry expires when its row does, not a full TTL from now.
+    _lru.put(key, output, ttl_left)
+    return output
+
+
+def store_claims(db: Session, text: str, output: GeminiClaimsOutput):
+    global _writes_since_evict
+
+    key = cache_key(text)
+    now = datetime.utcnow()
+
+    entry = db.get(ExtractionCacheEntry, key)
+    if entry is None:
+        entry = ExtractionCacheEntry(
+            cache_key=key,
+            model=EXTRACTION_MODEL,
+            prompt_version=EXTRACTION_PROMPT_VERSION,
+            hit_count=0,
+        )
+        db.add(entry)
+
+    entry.payload = output.dict()
+    entry.created_at = now
+    entry.last_used_at = now
+    db.commit()
+
+    _lru.put(key, output)
+
+    _writes_since_evict += 1
+    if _writes_since_evict >= EVICT_EVERY_N_WRITES:
+        _writes_since_evict = 0
+        evict(db)
+
+
+def extract_claims_cached(db: Session, text: str) -> GeminiClaimsOutput:
+    cached = get_cached_claims(db, text)
+    if cached is not None:
+        return cached
+
+    output = extract_claims_from_text(text)
+    store_claims(db, text, output)
+    return output
+
+
+def extract_claims_many(
+    db: Session, texts: dict[str, str]
+) -> dict[str, GeminiClaimsOutput | Exception]:
+    """Cached extraction for several texts; misses share batched prompts."""
+    keys = {key: cache_key(text) for key, text in texts.items()}
+    unique_texts = {}
+    for key, text in texts.items():
+        unique_texts.setdefault(keys[key], text)
+
+    outputs = {
+        digest: get_cached_claims(db, text) for digest, text in unique_texts.items()
+    }
+    misses = {
+        digest: unique_texts[digest]
+        for digest, cached in outputs.items()
+        if cached is None
+    }
+
+    if misses:
+        for digest, output in asyncio.run(extract_claims_many_async(misses)).items():
+            if isinstance(output, GeminiClaimsOutput):
+                store_claims(db, misses[digest], output)
+            outputs[digest] = output
+
+    return {key: outputs[digest] for key, digest in keys.items()}
+
+
+def evict(db: Session) -> int:
+    """Drop expired rows, then the least recently used rows over CACHE_MAX_ROWS."""
+    cutoff = datetime.utcnow() - timedelta(seconds=CACHE_TTL_SECONDS)
+    expired = db.execute(
+        delete(ExtractionCacheEntry).where(ExtractionCacheEntry.created_at < cutoff)
+    ).rowcount
+
+    overflow_keys = (
+        select(ExtractionCacheEntry.cache_key)
+        .order_by(ExtractionCacheEntry.last_used_at.desc())
+        .offset(CACHE_MAX_ROWS)
+        .scalar_subquery()
+    )
+    overflow = db.execute(
+        delete(ExtractionCacheEntry).where(
+            ExtractionCacheEntry.cache_key.in_(overflow_keys)
+        )
+    ).rowcount
+    db.commit()
+
+    return expired + overflow
+
+
+def invalidate(db: Session, text: str | None = None) -> int:
+    """Forget the cached extraction for ``text``, or every entry when None."""
+    stmt = delete(ExtractionCacheEntry)
+    if text is None:
+        _lru.clear()
+    else:
+        key = cache_key(text)
+        _lru.discard(key)
+        stmt = stmt.where(ExtractionCacheEntry.cache_key == key)
+
+    removed = db.execute(stmt).rowcount
+    db.commit()
+    return removed
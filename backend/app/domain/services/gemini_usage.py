@@ -0,0 +1,97 @@
+import logging
+from dataclasses import asdict, dataclass
+from datetime import datetime
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.gemini import UsageCollector
+from app.db.models import GeminiUsage
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class UsageSummary:
+    decision_id: int | None
+    endpoint: str
+    purpose: str
+    model: str
+    calls: int
+    errors: int
+    estimated_tokens: int
+    prompt_tokens: int
+    output_tokens: int
+    total_tokens: int
+    avg_latency_ms: float
+    max_latency_ms: float
+
+
+def save_usage(db: Session, collector: UsageCollector) -> int:
+    """Store the collected requests and commit; returns the rows written.
+
+    Accounting is best effort: a failed write is logged and rolled back
+    rather than failing the request that made the calls.
+    """
+    rows = [
+        {
+            "decision_id": collector.decision_id,
+            "endpoint": collector.endpoint,
+            **asdict(record),
+        }
+        for record in collector.records
+    ]
+    if not rows:
+        return 0
+
+    try:
+        db.execute(insert(GeminiUsage), rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception(
+            "Could not record %d Gemini usage rows for %s",
+            len(rows),
+            collector.endpoint,
+        )
+        return 0
+
+    return len(rows)
+
+
+def usage_summary(
+    db: Session,
+    decision_id: int | None = None,
+    endpoint: str | None = None,
+    since: datetime | None = None,
+) -> list[UsageSummary]:
+    """Token and latency totals per decision, endpoint, purpose and model."""
+    keys = (
+        GeminiUsage.decision_id,
+        GeminiUsage.endpoint,
+        GeminiUsage.purpose,
+        GeminiUsage.model,
+    )
+    query = (
+        select(
+            *keys,
+            func.count(),
+            func.count(GeminiUsage.error),
+            func.coalesce(func.sum(GeminiUsage.estimated_tokens), 0),
+            func.coalesce(func.sum(GeminiUsage.prompt_tokens), 0),
+            func.coalesce(func.sum(GeminiUsage.output_tokens), 0),
+            func.coalesce(func.sum(GeminiUsage.total_tokens), 0),
+            func.avg(GeminiUsage.latency_ms),
+            func.max(GeminiUsage.latency_ms),
+        )
+        .group_by(*keys)
+        .order_by(*keys)
+    )
+    if decision_id is not None:
+        query = query.where(GeminiUsage.decision_id == decision_id)
+    if endpoint is not None:
+        query = query.where(GeminiUsage.endpoint == endpoint)
+    if since is not None:
+        query = query.where(GeminiUsage.created_at >= since)
+
+    return [UsageSummary(*row) for row in db.execute(query)]
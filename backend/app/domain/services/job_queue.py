@@ -0,0 +1,121 @@
+import random
+from datetime import timedelta
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.db.models import Job, JobStatus
+from app.lib.get_env import get_env_variable
+
+BACKOFF_BASE_SECONDS = float(get_env_variable("JOB_BACKOFF_BASE_SECONDS", "5"))
+BACKOFF_MAX_SECONDS = float(get_env_variable("JOB_BACKOFF_MAX_SECONDS", "600"))
+# A running job whose worker has not finished it in this long is assumed to
+# belong to a dead worker and is handed out again.
+LOCK_TIMEOUT_SECONDS = int(get_env_variable("JOB_LOCK_TIMEOUT_SECONDS", "900"))
+
+# Every timestamp is taken from the database clock, so workers with skewed
+# clocks agree on which jobs are due and which locks have expired.
+
+
+def enqueue(db: Session, kind: str, payload: dict, max_attempts: int = 5) -> Job:
+    job = Job(
+        kind=kind,
+        payload=payload,
+        status=JobStatus.queued,
+        attempts=0,
+        max_attempts=max_attempts,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def claim_batch(db: Session, worker_id: str, limit: int) -> list[Job]:
+    """Lock up to ``limit`` of the oldest runnable jobs.
+
+    Concurrent workers skip rows another worker has already locked.
+    """
+    jobs = db.scalars(
+        select(Job)
+        .where(Job.status == JobStatus.queued, Job.run_after <= func.now())
+        .order_by(Job.run_after, Job.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).all()
+
+    if not jobs:
+        db.rollback()
+        return []
+
+    for job in jobs:
+        job.status = JobStatus.running
+        job.attempts += 1
+        job.locked_at = func.now()
+        job.locked_by = worker_id
+    db.commit()
+    return list(jobs)
+
+
+def claim_next(db: Session, worker_id: str) -> Job | None:
+    jobs = claim_batch(db, worker_id, 1)
+    return jobs[0] if jobs else None
+
+
+def complete(db: Session, job: Job, result: dict | None = None):
+    job.status = JobStatus.succeeded
+    job.result = result
+    job.last_error = None
+    job.locked_at = None
+    job.locked_by = None
+    db.commit()
+
+
+def backoff_seconds(attempts: int) -> float:
+    delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def fail(db: Session, job: Job, error: str):
+    job.last_error = error
+    job.locked_at = None
+    job.locked_by = None
+
+    if job.attempts >= job.max_attempts:
+        job.status = JobStatus.failed
+    else:
+        job.status = JobStatus.queued
+        job.run_after = func.now() + timedelta(seconds=backoff_seconds(job.attempts))
+
+    db.commit()
+
+
+def requeue_stale(db: Session) -> int:
+    """Hand jobs whose worker lock expired out again; returns the jobs touched.
+
+    An expired lock counts as a failed attempt, so a job that keeps killing
+    its worker ends up failed instead of being retried forever.
+    """
+    stale = (
+        update(Job)
+        .where(
+            Job.status == JobStatus.running,
+            Job.locked_at < func.now() - timedelta(seconds=LOCK_TIMEOUT_SECONDS),
+        )
+        .values(
+            attempts=Job.attempts + 1,
+            locked_at=None,
+            locked_by=None,
+            last_error="Worker lock expired",
+        )
+    )
+    failed = db.execute(
+        stale.where(Job.attempts + 1 >= Job.max_attempts).values(
+            status=JobStatus.failed
+        )
+    ).rowcount
+    requeued = db.execute(
+        stale.values(status=JobStatus.queued, run_after=func.now())
+    ).rowcount
+    db.commit()
+    return failed + requeued
@@ -0,0 +1,155 @@
+import numpy as np
+from sqlalchemy import and_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.text_vectors import corpus_idf, hashed_counts, is_negated, tfidf_rows
+from app.db.models import (
+    Claim,
+    ClaimEffect,
+    DecisionClaimLink,
+    DecisionOption,
+    Document,
+    OptionClaimCheck,
+)
+from app.domain.services.option_scores import refresh_option_scores
+from app.lib.get_env import get_env_variable
+
+# Cosine similarity between claim and option text needed for a link.
+MIN_SIMILARITY = float(get_env_variable("OPTION_LINK_MIN_SIMILARITY", "0.12"))
+INSERT_BATCH_SIZE = 5000
+
+
+def _option_text(name: str, description: str | None) -> str:
+    return f"{name}. {description}" if description else name
+
+
+def propose_links(
+    options: list[tuple[int, str]],
+    claims: list[tuple[int, str]],
+    pending: list[tuple[int, int]],
+    min_similarity: float = MIN_SIMILARITY,
+) -> list[dict]:
+    """Links for the (option_id, claim_id) ``pending`` pairs similar enough.
+
+    ``claims`` is the decision's whole claim corpus, so a claim's IDF, and
+    with it its score, does not depend on which claims are pending. The
+    similarity becomes the weight; a claim whose polarity differs from the
+    option's weakens it.
+    """
+    if not options or not claims or not pending:
+        return []
+
+    claim_counts = hashed_counts([text for _, text in claims])
+    idf = corpus_idf(claim_counts)
+    claim_vectors = tfidf_rows(claim_counts, idf)
+    option_vectors = tfidf_rows(hashed_counts([text for _, text in options]), idf)
+    similarity = (claim_vectors @ option_vectors.T).toarray()
+
+    claim_rows = {claim_id: row for row, (claim_id, _) in enumerate(claims)}
+    option_cols = {option_id: col for col, (option_id, _) in enumerate(options)}
+    rows = np.array([claim_rows[claim_id] for _, claim_id in pending])
+    cols = np.array([option_cols[option_id] for option_id, _ in pending])
+    scores = similarity[rows, cols]
+
+    option_negated = [is_negated(text) for _, text in options]
+    links = []
+    for i in np.nonzero(scores >= min_similarity)[0]:
+        row, col = rows[i], cols[i]
+        effect = (
+            ClaimEffect.weakens
+            if is_negated(claims[row][1]) != option_negated[col]
+            else ClaimEffect.supports
+        )
+        links.append(
+            {
+                "option_id": options[col][0],
+                "claim_id": claims[row][0],
+                "effect": effect,
+                "weight": round(float(scores[i]), 3),
+            }
+        )
+    return links
+
+
+def _insert_new(db: Session, model, rows: list[dict], returning) -> list:
+    inserted = []
+    for i in range(0, len(rows), INSERT_BATCH_SIZE):
+        stmt = (
+            insert(model)
+            .values(rows[i : i + INSERT_BATCH_SIZE])
+            .on_conflict_do_nothing()
+            .returning(returning)
+        )
+        inserted.extend(db.execute(stmt).scalars())
+    return inserted
+
+
+def link_claims_for_decision(
+    db: Session, decision_id: int, min_similarity: float = MIN_SIMILARITY
+) -> int:
+    """Link the decision's unscored claims to its options; returns links added.
+
+    Every (option, claim) pair scored is recorded in option_claim_checks in
+    the same transaction as its links, so a re-run only scores pairs it has
+    not seen: new claims, and every claim for a new option. A claim that a
+    concurrent ingest commits mid-run is simply picked up by the next run.
+    Existing links are left alone.
+    """
+    pending = db.execute(
+        select(DecisionOption.id, Claim.id)
+        .join(Document, Document.decision_id == DecisionOption.decision_id)
+        .join(Claim, Claim.document_id == Document.id)
+        .outerjoin(
+            OptionClaimCheck,
+            and_(
+                OptionClaimCheck.option_id == DecisionOption.id,
+                OptionClaimCheck.claim_id == Claim.id,
+            ),
+        )
+        .where(
+            DecisionOption.decision_id == decision_id,
+            OptionClaimCheck.option_id.is_(None),
+        )
+    ).all()
+    if not pending:
+        return 0
+
+    options = [
+        (option_id, _option_text(name, description))
+        for option_id, name, description in db.execute(
+            select(DecisionOption.id, DecisionOption.name, DecisionOption.description)
+            .where(DecisionOption.decision_id == decision_id)
+            .order_by(DecisionOption.id)
+        )
+    ]
+    claims = [
+        (claim_id, normalized or text)
+        for claim_id, text, normalized in db.execute(
+            select(Claim.id, Claim.text, Claim.normalized_text)
+            .join(Document, Document.id == Claim.document_id)
+            .where(Document.decision_id == decision_id)
+            .order_by(Claim.id)
+        )
+    ]
+    option_ids = {option_id for option_id, _ in options}
+    claim_ids = {claim_id for claim_id, _ in claims}
+    pending = [(o, c) for o, c in pending if o in option_ids and c in claim_ids]
+
+    links = propose_links(options, claims, pending, min_similarity)
+    linked_option_ids = _insert_new(
+        db, DecisionClaimLink, links, DecisionClaimLink.option_id
+    )
+    _insert_new(
+        db,
+        OptionClaimCheck,
+        [{"option_id": o, "claim_id": c} for o, c in pending],
+        OptionClaimCheck.option_id,
+    )
+
+    # The Core insert skips the flush hooks, so refresh scores here.
+    if linked_option_ids:
+        refresh_option_scores(db, option_ids=set(linked_option_ids))
+    db.commit()
+
+    return len(linked_option_ids)
@@ -0,0 +1,167 @@
+from itertools import chain
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.scoring import MAX_DEPTH
+from app.core.scoring_engine import score_decision
+from app.db.models import (
+    Claim,
+    ClaimRelation,
+    DecisionClaimLink,
+    DecisionOption,
+    OptionScoreEntry,
+)
+from app.domain.repository import DecisionRepository
+
+# session.info keys for changes seen in after_flush, consumed after it.
+_CHANGED_OPTIONS = "option_scores.options"
+_CHANGED_CLAIMS = "option_scores.claims"
+_CHANGED_SOURCES = "option_scores.relation_sources"
+
+
+def recompute_option_scores(db: Session, option_ids) -> dict[int, float]:
+    """Rescore ``option_ids`` from the claim graph and store the results."""
+    option_ids = sorted(set(option_ids))
+    if not option_ids:
+        return {}
+
+    decision_ids = dict(
+        db.execute(
+            select(DecisionOption.id, DecisionOption.decision_id).where(
+                DecisionOption.id.in_(option_ids)
+            )
+        ).all()
+    )
+    # Deleted options drop out here; their rows go with the FK cascade.
+    option_ids = [option_id for option_id in option_ids if option_id in decision_ids]
+    if not option_ids:
+        return {}
+
+    repo = DecisionRepository(db)
+    links = repo.get_link_rows_for_options(option_ids)
+    relations = repo.get_relation_rows_within(
+        {link.claim_id for link in links}, MAX_DEPTH
+    )
+    scores = score_decision(option_ids, links, relations, MAX_DEPTH)
+
+    stmt = insert(OptionScoreEntry).values(
+        [
+            {
+                "option_id": option_id,
+                "decision_id": decision_ids[option_id],
+                "score": score,
+            }
+            for option_id, score in scores.items()
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[OptionScoreEntry.option_id],
+        set_={"score": stmt.excluded.score, "updated_at": func.now()},
+    )
+    # Core on the session's connection, so this is safe inside a flush.
+    db.connection().execute(stmt)
+
+    return scores
+
+
+def refresh_option_scores(
+    db: Session, option_ids=(), claim_ids=(), relation_source_ids=()
+) -> dict[int, float]:
+    """Rescore only the options a change can reach.
+
+    ``option_ids`` had links added, changed or removed, ``claim_ids`` had
+    their confidence changed, and ``relation_source_ids`` are the from-claims
+    of relations added, changed or removed. Call this directly after bulk
+    Core writes, which the ORM listeners below never see.
+    """
+    repo = DecisionRepository(db)
+    affected = set(option_ids)
+
+    # Confidence only scales a claim's own seed, so only direct links count.
+    claims = set(claim_ids)
+    if relation_source_ids:
+        # A relation is walked by any option linked within MAX_DEPTH - 1
+        # hops upstream of its source.
+        claims |= repo.get_upstream_claim_ids(relation_source_ids, MAX_DEPTH - 1)
+    if claims:
+        affected |= repo.get_option_ids_linked_to(claims)
+
+    return recompute_option_scores(db, affected)
+
+
+def get_option_scores(
+    db: Session, decision_id: int, option_ids: list[int]
+) -> dict[int, float]:
+    """Stored scores for a decision, computing any that are missing.
+
+    Computed scores are written in the current transaction; committing is
+    left to the caller.
+    """
+    scores = dict(
+        db.execute(
+            select(OptionScoreEntry.option_id, OptionScoreEntry.score).where(
+                OptionScoreEntry.decision_id == decision_id
+            )
+        ).all()
+    )
+
+    missing = [option_id for option_id in option_ids if option_id not in scores]
+    if missing:
+        scores.update(recompute_option_scores(db, missing))
+
+    return scores
+
+
+def _values(obj, attr: str) -> set:
+    # Old and new value, so moving a link or relation rescores both ends.
+    history = inspect(obj).attrs[attr].history
+    values = {*history.added, *history.unchanged, *history.deleted}
+    values.add(getattr(obj, attr, None))
+    values.discard(None)
+    return values
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_deleted_claims(session: Session, flush_context, instances):
+    # Deleting a claim takes its links and relations with it, so the options
+    # that reach it have to be found while the graph still holds them.
+    claim_ids = {obj.id for obj in session.deleted if isinstance(obj, Claim)}
+    if not claim_ids:
+        return
+
+    repo = DecisionRepository(session)
+    upstream = repo.get_upstream_claim_ids(claim_ids, MAX_DEPTH - 1)
+    session.info.setdefault(_CHANGED_OPTIONS, set()).update(
+        repo.get_option_ids_linked_to(upstream)
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session: Session, flush_context):
+    options = session.info.setdefault(_CHANGED_OPTIONS, set())
+    claims = session.info.setdefault(_CHANGED_CLAIMS, set())
+    sources = session.info.setdefault(_CHANGED_SOURCES, set())
+
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+
+        if isinstance(obj, DecisionClaimLink):
+            options.update(_values(obj, "option_id"))
+        elif isinstance(obj, ClaimRelation):
+            sources.update(_values(obj, "from_claim_id"))
+        elif isinstance(obj, Claim) and obj in session.dirty:
+            if inspect(obj).attrs.confidence.history.has_changes():
+                claims.add(obj.id)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _refresh_changed(session: Session, flush_context):
+    options = session.info.pop(_CHANGED_OPTIONS, set())
+    claims = session.info.pop(_CHANGED_CLAIMS, set())
+    sources = session.info.pop(_CHANGED_SOURCES, set())
+
+    if options or claims or sources:
+        refresh_option_scores(session, options, claims, sources)
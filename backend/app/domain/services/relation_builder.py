@@ -0,0 +1,108 @@
+from sqlalchemy import or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.text_vectors import hashed_tfidf, is_negated, top_k_similar
+from app.db.models import (
+    Claim,
+    ClaimRelation,
+    DecisionClaimLink,
+    DecisionOption,
+    Document,
+    RelationType,
+)
+from app.domain.services.option_scores import refresh_option_scores
+from app.lib.get_env import get_env_variable
+
+TOP_K = int(get_env_variable("RELATION_TOP_K", "5"))
+MIN_SIMILARITY = float(get_env_variable("RELATION_MIN_SIMILARITY", "0.2"))
+INSERT_BATCH_SIZE = 5000
+
+
+def _decision_claims(db: Session, decision_id: int) -> list[tuple[int, str]]:
+    """Claims from the decision's documents and claims linked to its options."""
+    linked = (
+        select(DecisionClaimLink.claim_id)
+        .join(DecisionOption, DecisionOption.id == DecisionClaimLink.option_id)
+        .where(DecisionOption.decision_id == decision_id)
+    )
+    rows = db.execute(
+        select(Claim.id, Claim.text, Claim.normalized_text)
+        .join(Document, Document.id == Claim.document_id)
+        .where(or_(Document.decision_id == decision_id, Claim.id.in_(linked)))
+        .order_by(Claim.id)
+    )
+    return [(claim_id, normalized or text) for claim_id, text, normalized in rows]
+
+
+def propose_relations(
+    claims: list[tuple[int, str]], k: int = TOP_K, min_similarity=MIN_SIMILARITY
+) -> list[dict]:
+    """supports/contradicts edges between each claim and its nearest neighbours.
+
+    Similar claims with the same polarity support each other; one negated
+    and one not contradict. Edges go both ways with the cosine similarity as
+    strength, since similarity says nothing about direction.
+    """
+    if len(claims) < 2:
+        return []
+
+    ids = [claim_id for claim_id, _ in claims]
+    texts = [text for _, text in claims]
+    vectors = hashed_tfidf(texts)
+    negated = [is_negated(text) for text in texts]
+
+    pairs = {}
+    for i, j, similarity in top_k_similar(
+        vectors, vectors, k, min_similarity, exclude_self=True
+    ):
+        key = (min(i, j), max(i, j))
+        pairs[key] = max(pairs.get(key, 0.0), similarity)
+
+    relations = []
+    for (i, j), similarity in sorted(pairs.items()):
+        relation_type = (
+            RelationType.contradicts
+            if negated[i] != negated[j]
+            else RelationType.supports
+        )
+        strength = round(similarity, 3)
+        for a, b in ((i, j), (j, i)):
+            relations.append(
+                {
+                    "from_claim_id": ids[a],
+                    "to_claim_id": ids[b],
+                    "relation_type": relation_type,
+                    "strength": strength,
+                }
+            )
+    return relations
+
+
+def build_relations_for_decision(
+    db: Session, decision_id: int, k: int = TOP_K, min_similarity=MIN_SIMILARITY
+) -> int:
+    """Infer and store relations for a decision's claims; returns rows added.
+
+    Existing relations are left alone. The insert bypasses the ORM, so the
+    affected option scores are refreshed explicitly afterwards.
+    """
+    relations = propose_relations(_decision_claims(db, decision_id), k, min_similarity)
+
+    inserted = []
+    for i in range(0, len(relations), INSERT_BATCH_SIZE):
+        stmt = (
+            insert(ClaimRelation)
+            .values(relations[i : i + INSERT_BATCH_SIZE])
+            .on_conflict_do_nothing(
+                index_elements=["from_claim_id", "to_claim_id", "relation_type"]
+            )
+            .returning(ClaimRelation.from_claim_id)
+        )
+        inserted.extend(db.execute(stmt).scalars())
+
+    if inserted:
+        refresh_option_scores(db, relation_source_ids=set(inserted))
+    db.commit()
+
+    return len(inserted)
@@ -0,0 +1,84 @@
+import hashlib
+import json
+import math
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.gemini import (
+    REPORT_CONTEXT_TOKENS,
+    REPORT_EVIDENCE_TOKENS,
+    REPORT_MODEL,
+    REPORT_PROMPT_VERSION,
+)
+from app.db.models import ConsultantReport
+from app.lib.get_env import get_env_variable
+
+# Scores that differ by less than a bucket produce the same report.
+SCORE_BUCKET_SIZE = float(get_env_variable("REPORT_SCORE_BUCKET_SIZE", "0.5"))
+
+
+def report_fingerprint(
+    option_id: int, score: float, reasons: list[str], document_hashes: list[str]
+) -> str:
+    """``document_hashes`` are the sha256 of each context document's text."""
+    payload = {
+        "option_id": option_id,
+        "score_bucket": math.floor(score / SCORE_BUCKET_SIZE),
+        "reasons": reasons,
+        "documents": document_hashes,
+        "model": REPORT_MODEL,
+        "prompt_version": REPORT_PROMPT_VERSION,
+        "budgets": [REPORT_CONTEXT_TOKENS, REPORT_EVIDENCE_TOKENS],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def get_stored_report(
+    db: Session, decision_id: int, fingerprint: str
+) -> ConsultantReport | None:
+    return db.scalars(
+        select(ConsultantReport).where(
+            ConsultantReport.decision_id == decision_id,
+            ConsultantReport.fingerprint == fingerprint,
+        )
+    ).first()
+
+
+def get_latest_report(db: Session, decision_id: int) -> ConsultantReport | None:
+    return db.scalars(
+        select(ConsultantReport)
+        .where(ConsultantReport.decision_id == decision_id)
+        .order_by(ConsultantReport.created_at.desc(), ConsultantReport.id.desc())
+        .limit(1)
+    ).first()
+
+
+def save_report(
+    db: Session, decision_id: int, option_id: int, fingerprint: str, content: str
+) -> ConsultantReport:
+    existing = get_stored_report(db, decision_id, fingerprint)
+    if existing is not None:
+        # A forced refresh replaces the stored text for the same inputs.
+        existing.content = content
+        db.commit()
+        return existing
+
+    report = ConsultantReport(
+        decision_id=decision_id,
+        option_id=option_id,
+        fingerprint=fingerprint,
+        model=REPORT_MODEL,
+        prompt_version=REPORT_PROMPT_VERSION,
+        content=content,
+    )
+    db.add(report)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another request generated the same report first; keep theirs.
+        db.rollback()
+        return get_stored_report(db, decision_id, fingerprint)
+
+    return report
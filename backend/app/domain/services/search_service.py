@@ -0,0 +1,137 @@
+from dataclasses import dataclass
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.db.models import Claim, Document, DocumentPage
+
+# Must match the config the search_vector columns are generated with.
+TS_CONFIG = "english"
+HEADLINE_OPTIONS = (
+    "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2"
+)
+MAX_PAGE_SIZE = 100
+
+
+@dataclass
+class ClaimHit:
+    claim_id: int
+    document_id: int
+    document_title: str
+    page_number: int | None
+    span_start: int | None
+    span_end: int | None
+    rank: float
+    snippet: str
+
+
+@dataclass
+class PageHit:
+    document_id: int
+    document_title: str
+    page_number: int
+    char_start: int
+    char_end: int
+    rank: float
+    snippet: str
+
+
+def _query(text: str):
+    # websearch syntax: quoted phrases, OR, and -exclusions.
+    return func.websearch_to_tsquery(TS_CONFIG, text)
+
+
+def search_claims(
+    db: Session,
+    text: str,
+    decision_id: int | None = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> tuple[list[ClaimHit], bool]:
+    """Claims matching ``text``, best first, and whether more pages follow.
+
+    Ranking and paging run on the GIN-indexed vector alone; snippets are
+    built only for the rows on the requested page.
+    """
+    query = _query(text)
+    ranked = (
+        select(
+            Claim.id.label("claim_id"),
+            func.ts_rank_cd(Claim.search_vector, query).label("rank"),
+        )
+        .where(Claim.search_vector.op("@@")(query))
+        .order_by(func.ts_rank_cd(Claim.search_vector, query).desc(), Claim.id)
+        .limit(limit + 1)
+        .offset(offset)
+    )
+    if decision_id is not None:
+        ranked = ranked.join(Document, Document.id == Claim.document_id).where(
+            Document.decision_id == decision_id
+        )
+    ranked = ranked.subquery()
+
+    rows = db.execute(
+        select(
+            Claim.id,
+            Claim.document_id,
+            Document.title,
+            Claim.page_number,
+            Claim.span_start,
+            Claim.span_end,
+            ranked.c.rank,
+            func.ts_headline(TS_CONFIG, Claim.text, query, HEADLINE_OPTIONS),
+        )
+        .join(ranked, ranked.c.claim_id == Claim.id)
+        .join(Document, Document.id == Claim.document_id)
+        .order_by(ranked.c.rank.desc(), Claim.id)
+    ).all()
+
+    hits = [ClaimHit(*row) for row in rows[:limit]]
+    return hits, len(rows) > limit
+
+
+def search_pages(
+    db: Session,
+    text: str,
+    decision_id: int | None = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> tuple[list[PageHit], bool]:
+    """Document pages matching ``text``, best first."""
+    query = _query(text)
+    ranked = (
+        select(
+            DocumentPage.id.label("page_id"),
+            func.ts_rank_cd(DocumentPage.search_vector, query).label("rank"),
+        )
+        .where(DocumentPage.search_vector.op("@@")(query))
+        .order_by(
+            func.ts_rank_cd(DocumentPage.search_vector, query).desc(),
+            DocumentPage.id,
+        )
+        .limit(limit + 1)
+        .offset(offset)
+    )
+    if decision_id is not None:
+        ranked = ranked.join(Document, Document.id == DocumentPage.document_id).where(
+            Document.decision_id == decision_id
+        )
+    ranked = ranked.subquery()
+
+    rows = db.execute(
+        select(
+            DocumentPage.document_id,
+            Document.title,
+            DocumentPage.page_number,
+            DocumentPage.char_start,
+            DocumentPage.char_end,
+            ranked.c.rank,
+            func.ts_headline(TS_CONFIG, DocumentPage.text, query, HEADLINE_OPTIONS),
+        )
+        .join(ranked, ranked.c.page_id == DocumentPage.id)
+        .join(Document, Document.id == DocumentPage.document_id)
+        .order_by(ranked.c.rank.desc(), DocumentPage.id)
+    ).all()
+
+    hits = [PageHit(*row) for row in rows[:limit]]
+    return hits, len(rows) > limit
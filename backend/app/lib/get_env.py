@@ -3,9 +3,13 @@ import os
 
 # load_dotenv()
 
+_REQUIRED = object()
 
-def get_env_variable(name):
+
+def get_env_variable(name, default=_REQUIRED):
     try:
         return os.environ[name]
     except KeyError:
+        if default is not _REQUIRED:
+            return default
         raise EnvironmentError(f"Gagal memuat variabel lingkungan wajib: {name}")
@@ -1,12 +1,28 @@
+import json
+from datetime import datetime
+
 from dotenv import load_dotenv
-from fastapi import FastAPI, Depends, UploadFile, File, BackgroundTasks
+from fastapi import FastAPI, Depends, HTTPException, Query, UploadFile, File
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.models import Decision, DecisionOption
-from app.db.session import SessionLocal
+from app.db.models import Decision, DecisionOption, Job, JobStatus
+from app.db.session import AsyncSessionLocal, SessionLocal
+from app.core.gemini import resilience_state
 from fastapi.middleware.cors import CORSMiddleware
-from app.domain.services.decision_engine import evaluate_decision
-from app.domain.services.document_processor import process_and_save_document
+from fastapi.responses import StreamingResponse
+from app.domain.services import job_queue
+from app.domain.services.decision_engine import (
+    evaluate_decision,
+    iter_evaluation_events,
+)
+from app.domain.services.document_processor import UploadTooLargeError, save_upload
+from app.domain.services.gemini_usage import usage_summary
+from app.domain.services.search_service import (
+    MAX_PAGE_SIZE,
+    search_claims,
+    search_pages,
+)
 from app.lib.get_env import get_env_variable
 
 load_dotenv()
@@ -25,8 +41,26 @@ app.add_middleware(
 )
 
 
+class OptionCreate(BaseModel):
+    name: str
+    description: str | None = None
+
+
+DEFAULT_OPTIONS = [
+    OptionCreate(name="Option A (Proceed)", description="Go ahead with the plan."),
+    OptionCreate(
+        name="Option B (Status Quo)", description="Keep things as they are now."
+    ),
+    OptionCreate(
+        name="Option C (Alternative)", description="Pursue a different approach."
+    ),
+]
+
+
 class DecisionCreate(BaseModel):
     title: str
+    # Option descriptions are what claims get linked against.
+    options: list[OptionCreate] | None = None
 
 
 class DecisionResponse(BaseModel):
@@ -46,6 +80,11 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 @app.post("/decisions", response_model=DecisionResponse)
 def create_decision(decision_in: DecisionCreate, db: Session = Depends(get_db)):
     new_decision = Decision(title=decision_in.title, description="User created project")
@@ -54,48 +93,148 @@ def create_decision(decision_in: DecisionCreate, db: Session = Depends(get_db)):
 
     db.refresh(new_decision)
 
-    opt1 = DecisionOption(decision_id=new_decision.id, name="Option A (Proceed)")
-    opt2 = DecisionOption(decision_id=new_decision.id, name="Option B (Status Quo)")
-    opt3 = DecisionOption(decision_id=new_decision.id, name="Option C (Alternative)")
-
-    db.add_all([opt1, opt2, opt3])
+    db.add_all(
+        [
+            DecisionOption(
+                decision_id=new_decision.id,
+                name=option.name,
+                description=option.description,
+            )
+            for option in decision_in.options or DEFAULT_OPTIONS
+        ]
+    )
     db.commit()
 
     return new_decision
 
 
 @app.get("/decisions/{decision_id}/evaluate")
-async def get_decision(decision_id: int, db: Session = Depends(get_db)):
+async def get_decision(decision_id: int, db: AsyncSession = Depends(get_async_db)):
     result = await evaluate_decision(decision_id, db)
     return result
 
 
+@app.post("/decisions/{decision_id}/report/refresh")
+async def refresh_report(decision_id: int, db: AsyncSession = Depends(get_async_db)):
+    result = await evaluate_decision(decision_id, db, refresh=True)
+    return result
+
+
+@app.get("/decisions/{decision_id}/evaluate/stream")
+async def stream_decision(decision_id: int):
+    async def events():
+        # The stream outlives the request dependencies, so it owns its session.
+        async with AsyncSessionLocal() as db:
+            async for event, data in iter_evaluation_events(decision_id, db):
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.post("/documents/upload")
-async def upload_document(
+def upload_document(
     decision_id: int,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
 ):
-    process_and_save_document(db, file, decision_id)
+    try:
+        upload = save_upload(file)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    job = job_queue.enqueue(
+        db,
+        "ingest_document",
+        {
+            "file_location": upload.file_location,
+            "content_sha256": upload.content_sha256,
+            "filename": file.filename,
+            "decision_id": decision_id,
+        },
+    )
 
     return {
         "filename": file.filename,
         "status": "processing_started",
         "linked_to_decision": decision_id,
+        "job_id": job.id,
+    }
+
+
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    status: JobStatus
+    attempts: int
+    max_attempts: int
+    last_error: str | None = None
+    result: dict | None = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    job = db.get(Job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.get("/search/claims")
+async def search_claim_evidence(
+    q: str = Query(..., min_length=1),
+    decision_id: int | None = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db),
+):
+    hits, has_more = await db.run_sync(search_claims, q, decision_id, limit, offset)
+    return {
+        "query": q,
+        "limit": limit,
+        "offset": offset,
+        "has_more": has_more,
+        "hits": hits,
+    }
+
+
+@app.get("/search/pages")
+async def search_document_pages(
+    q: str = Query(..., min_length=1),
+    decision_id: int | None = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db),
+):
+    hits, has_more = await db.run_sync(search_pages, q, decision_id, limit, offset)
+    return {
+        "query": q,
+        "limit": limit,
+        "offset": offset,
+        "has_more": has_more,
+        "hits": hits,
     }
 
 
-# @app.post("/documents/upload")
-# async def upload_document(
-#     background_tasks: BackgroundTasks,
-#     decision_id: int,
-#     file: UploadFile = File(...),
-#     db: Session = Depends(get_db),
-# ):
-#     background_tasks.add_task(process_and_save_document, db, file, decision_id)
-#
-#     return {
-#         "filename": file.filename,
-#         "status": "processing_started",
-#         "linked_to_decision": decision_id,
-#     }
+@app.get("/health/gemini")
+def get_gemini_health():
+    return resilience_state()
+
+
+@app.get("/usage/gemini")
+async def get_gemini_usage(
+    decision_id: int | None = None,
+    endpoint: str | None = None,
+    since: datetime | None = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Gemini token and latency totals, grouped per decision and endpoint."""
+    return await db.run_sync(usage_summary, decision_id, endpoint, since)
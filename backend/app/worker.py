@@ -0,0 +1,185 @@
+import argparse
+import multiprocessing
+import os
+import signal
+import socket
+import time
+
+from sqlalchemy.orm import Session
+
+from app.core.gemini import track_usage
+from app.core.pdf import pdf_extractor
+from app.db.models import Job
+from app.db.session import SessionLocal
+from app.domain.services import job_queue
+from app.domain.services.document_processor import (
+    ingest_claims_for_documents,
+    ingest_document,
+)
+from app.domain.services.gemini_usage import save_usage
+from app.domain.services.option_linker import link_claims_for_decision
+from app.lib.get_env import get_env_variable
+
+POLL_INTERVAL_SECONDS = 2.0
+# Jobs claimed per poll; ingest jobs in one batch share extraction prompts.
+BATCH_SIZE = int(get_env_variable("WORKER_BATCH_SIZE", "8"))
+STALE_CHECK_INTERVAL_SECONDS = 60.0
+
+
+def _ingest_document_for_job(db: Session, job: Job):
+    payload = job.payload
+    document_id = (job.result or {}).get("document_id")
+
+    doc = ingest_document(
+        db,
+        payload["file_location"],
+        payload["filename"],
+        payload["decision_id"],
+        document_id=document_id,
+        content_sha256=payload.get("content_sha256"),
+    )
+
+    # Remember the document before extracting claims, so a retry after a
+    # Gemini failure does not create it a second time.
+    if document_id is None:
+        job.result = {"document_id": doc.id}
+        db.commit()
+
+    return doc
+
+
+def handle_ingest_documents(db: Session, jobs: list[Job]) -> dict:
+    outcomes = {}
+    docs_by_job = {}
+
+    for job in jobs:
+        try:
+            docs_by_job[job.id] = _ingest_document_for_job(db, job)
+        except Exception as e:
+            db.rollback()
+            outcomes[job.id] = e
+
+    # Claims for every document in the batch are extracted together, so
+    # short documents share prompts. Usage is only attributed to a decision
+    # when the whole batch belongs to it.
+    batch_decisions = {doc.decision_id for doc in docs_by_job.values()}
+    with track_usage(
+        "ingest_document",
+        batch_decisions.pop() if len(batch_decisions) == 1 else None,
+    ) as usage:
+        claims_by_doc = ingest_claims_for_documents(db, list(docs_by_job.values()))
+    save_usage(db, usage)
+
+    decision_ids = set()
+    for job_id, doc in docs_by_job.items():
+        claims = claims_by_doc[doc.id]
+        if isinstance(claims, Exception):
+            outcomes[job_id] = claims
+        else:
+            outcomes[job_id] = {"document_id": doc.id, "claims": len(claims)}
+            if doc.decision_id is not None:
+                decision_ids.add(doc.decision_id)
+
+    # The documents are already stored; a failed link run is picked up by
+    # the next one, since pairs are only marked as scored on commit.
+    for decision_id in sorted(decision_ids):
+        try:
+            links = link_claims_for_decision(db, decision_id)
+            print(f"Decision {decision_id}: {links} new claim links")
+        except Exception as e:
+            db.rollback()
+            print(f"Decision {decision_id}: claim linking failed: {e}")
+
+    return outcomes
+
+
+HANDLERS = {
+    "ingest_document": handle_ingest_documents,
+}
+
+
+class _Stop:
+    requested = False
+
+
+def _request_stop(signum, frame):
+    _Stop.requested = True
+
+
+def run_batch(db: Session, worker_id: str) -> bool:
+    jobs = job_queue.claim_batch(db, worker_id, BATCH_SIZE)
+    if not jobs:
+        return False
+
+    jobs_by_kind = {}
+    for job in jobs:
+        jobs_by_kind.setdefault(job.kind, []).append(job)
+
+    for kind, kind_jobs in jobs_by_kind.items():
+        print(f"[{worker_id}] {len(kind_jobs)} {kind} job(s)")
+
+        handler = HANDLERS.get(kind)
+        if handler is None:
+            for job in kind_jobs:
+                job.attempts = job.max_attempts
+                job_queue.fail(db, job, f"Unknown job kind: {kind}")
+            continue
+
+        try:
+            outcomes = handler(db, kind_jobs)
+        except Exception as e:
+            db.rollback()
+            outcomes = {job.id: e for job in kind_jobs}
+
+        for job in kind_jobs:
+            outcome = outcomes[job.id]
+            if isinstance(outcome, Exception):
+                job_queue.fail(db, job, f"{type(outcome).__name__}: {outcome}")
+                print(f"[{worker_id}] Job {job.id} failed: {outcome}")
+            else:
+                job_queue.complete(db, job, outcome)
+
+    return True
+
+
+def run_worker():
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    signal.signal(signal.SIGTERM, _request_stop)
+    signal.signal(signal.SIGINT, _request_stop)
+
+    print(f"[{worker_id}] Worker started")
+    last_stale_check = 0.0
+
+    while not _Stop.requested:
+        db = SessionLocal()
+        try:
+            if time.monotonic() - last_stale_check > STALE_CHECK_INTERVAL_SECONDS:
+                job_queue.requeue_stale(db)
+                last_stale_check = time.monotonic()
+
+            worked = run_batch(db, worker_id)
+        finally:
+            db.close()
+
+        if not worked:
+            time.sleep(POLL_INTERVAL_SECONDS)
+
+    pdf_extractor.close()
+    print(f"[{worker_id}] Worker stopped")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run background job workers.")
+    parser.add_argument("--processes", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        run_worker()
+    else:
+        workers = [
+            multiprocessing.Process(target=run_worker) for _ in range(args.processes)
+        ]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
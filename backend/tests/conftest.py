@@ -0,0 +1,4 @@
+import os
+
+# app.core.gemini builds its client at import; tests never call the API.
+os.environ.setdefault("GEMINI_API_KEY", "test")
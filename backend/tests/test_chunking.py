@@ -0,0 +1,31 @@
+from app.core.chunking import dedupe_spans
+
+
+def _dedupe(items):
+    return dedupe_spans(
+        items,
+        key=lambda item: item[2],
+        span=lambda item: (item[0], item[1]),
+        confidence=lambda item: item[3],
+    )
+
+
+def test_overlapping_copies_keep_the_most_confident():
+    kept = _dedupe([(0, 10, "a", 0.5), (1, 10, "b", 0.9), (30, 40, "c", 0.5)])
+
+    assert kept == [(1, 10, "b", 0.9), (30, 40, "c", 0.5)]
+
+
+def test_replacement_that_starts_later_stays_in_start_order():
+    # The second "a" replaces the first but starts after "e"; the last item
+    # only overlaps that replacement, past where "e" would stop the scan.
+    kept = _dedupe(
+        [
+            (0, 10, "a", 0.5),
+            (5, 20, "e", 0.5),
+            (9, 30, "a", 0.9),
+            (27, 30, "g", 0.5),
+        ]
+    )
+
+    assert kept == [(5, 20, "e", 0.5), (9, 30, "a", 0.9)]
@@ -0,0 +1,83 @@
+from app.core import minhash
+from app.core.text_vectors import content_signature
+from app.domain.services.claim_dedup import (
+    DEDUP_THRESHOLD,
+    _bucket_keys,
+    merge_similarity,
+)
+
+
+def _similarity(a: str, b: str) -> float:
+    return merge_similarity(
+        minhash.signature(a),
+        content_signature(a),
+        minhash.signature(b),
+        content_signature(b),
+    )
+
+
+def _share_bucket(a: str, b: str) -> bool:
+    keys_a = _bucket_keys(minhash.signature(a), content_signature(a))
+    keys_b = _bucket_keys(minhash.signature(b), content_signature(b))
+    return any(x == y for x, y in zip(keys_a, keys_b))
+
+
+def test_rewordings_of_one_claim_merge():
+    claim = "The migration will cut hosting costs by 30%."
+    for variant in (
+        "the migration will cut hosting costs by 30 %",
+        "  The migration  will cut hosting costs by 30%",
+    ):
+        assert _similarity(claim, variant) >= DEDUP_THRESHOLD
+        assert _share_bucket(claim, variant)
+
+
+def test_paraphrases_of_one_claim_merge():
+    pairs = [
+        (
+            "The migration will cut hosting costs by 30%.",
+            "The migration will reduce hosting costs by 30%.",
+        ),
+        (
+            "Hosting costs will drop by 30% after the migration.",
+            "The migration will cut hosting costs by 30%.",
+        ),
+        (
+            "The team lacks Kubernetes experience.",
+            "The team has limited Kubernetes experience.",
+        ),
+    ]
+    for a, b in pairs:
+        assert _similarity(a, b) >= DEDUP_THRESHOLD, (a, b)
+        assert _share_bucket(a, b), (a, b)
+
+
+def test_distinct_claims_do_not_merge():
+    pairs = [
+        # One word apart, and close enough for MinHash alone to merge.
+        (
+            "Customer churn increased in the last quarter.",
+            "Customer churn decreased in the last quarter.",
+        ),
+        # One content word swapped.
+        (
+            "Customer churn increased in the last quarter.",
+            "Customer count increased in the last quarter.",
+        ),
+        ("Revenue grew 10% in 2023.", "Revenue grew 12% in 2023."),
+        ("Revenue grew 10% in 2023.", "Revenue fell 10% in 2023."),
+        ("The vendor offers 24/7 support.", "The vendor does not offer 24/7 support."),
+        (
+            "Customer churn increased in the last quarter.",
+            "The database is the main bottleneck at peak load.",
+        ),
+    ]
+    for a, b in pairs:
+        assert _similarity(a, b) < DEDUP_THRESHOLD, (a, b)
+
+
+def test_unrelated_claims_are_not_candidates():
+    assert not _share_bucket(
+        "Customer churn increased in the last quarter.",
+        "The database is the main bottleneck at peak load.",
+    )
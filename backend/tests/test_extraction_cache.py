@@ -0,0 +1,67 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.core.gemini import GeminiClaimsOutput
+from app.db.models import ExtractionCacheEntry
+from app.domain.services import extraction_cache
+from app.domain.services.extraction_cache import (
+    CACHE_TTL_SECONDS,
+    _LRUCache,
+    cache_key,
+    get_cached_claims,
+)
+
+
+def test_cache_key_is_exact_text():
+    # Spans are offsets into the text, so texts that differ only in line
+    # endings or surrounding whitespace must not share an entry.
+    text = "Costs rise.\nMigration is slow."
+
+    assert cache_key(text) == cache_key(text)
+    assert cache_key(text) != cache_key(text.replace("\n", "\r\n"))
+    assert cache_key(text) != cache_key(f"  {text}\n")
+
+
+def test_cache_key_depends_on_model_and_prompt_version():
+    text = "Costs rise."
+
+    assert cache_key(text, model="a") != cache_key(text, model="b")
+    assert cache_key(text, prompt_version="v1") != cache_key(text, prompt_version="v2")
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    ExtractionCacheEntry.__table__.create(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def test_database_hit_keeps_the_row_expiry_and_does_not_commit(db, monkeypatch):
+    monkeypatch.setattr(extraction_cache, "_lru", _LRUCache(8, CACHE_TTL_SECONDS))
+    text = "Costs rise."
+    key = cache_key(text)
+    db.add(
+        ExtractionCacheEntry(
+            cache_key=key,
+            model="m",
+            prompt_version="p",
+            payload={"claims": []},
+            hit_count=0,
+            created_at=datetime.utcnow() - timedelta(seconds=CACHE_TTL_SECONDS - 3600),
+        )
+    )
+    db.commit()
+
+    assert get_cached_claims(db, text) == GeminiClaimsOutput(claims=[])
+
+    expires_at, _ = extraction_cache._lru._items[key]
+    assert expires_at - time.monotonic() <= 3600
+
+    # The hit count is left for the caller's transaction.
+    db.rollback()
+    assert db.get(ExtractionCacheEntry, key).hit_count == 0
@@ -0,0 +1,113 @@
+import asyncio
+import contextvars
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import gemini
+from app.core.gemini import (
+    MAX_INPUT_TOKENS,
+    REPORT_CONTEXT_TOKENS,
+    REPORT_MODEL,
+    PromptTooLargeError,
+    _check_prompt_size,
+    build_report_prompt,
+    estimate_tokens,
+)
+from app.core.resilience import Hedger
+from app.core.retrieval import Passage
+
+
+def test_prompt_over_the_model_limit_is_refused():
+    limit = MAX_INPUT_TOKENS[REPORT_MODEL]
+
+    _check_prompt_size(REPORT_MODEL, limit)
+    with pytest.raises(PromptTooLargeError):
+        _check_prompt_size(REPORT_MODEL, limit + 1)
+
+
+def test_models_without_a_limit_are_not_checked():
+    _check_prompt_size("some-other-model", 10**9)
+
+
+def test_oversized_prompt_is_never_sent(monkeypatch):
+    class _Refuse:
+        def __getattr__(self, name):
+            raise AssertionError("the API was called")
+
+    monkeypatch.setattr(gemini, "client", _Refuse())
+    prompt = "x" * (MAX_INPUT_TOKENS[REPORT_MODEL] + 1) * gemini.CHARS_PER_TOKEN
+
+    with pytest.raises(PromptTooLargeError):
+        asyncio.run(gemini.generate_content_async(REPORT_MODEL, prompt))
+
+
+def test_report_prompt_fits_at_full_budgets():
+    reasons = ["SUPPORTS: " + "evidence " * 40] * 200
+    passage = "context " * 100
+    passages = [
+        Passage(1, i, passage)
+        for i in range(REPORT_CONTEXT_TOKENS // estimate_tokens(passage))
+    ]
+
+    prompt = build_report_prompt("Option A", 1.0, reasons, passages)
+    _check_prompt_size(REPORT_MODEL, estimate_tokens(prompt))
+
+
+def test_hedged_call_is_charged_to_the_rate_limit_once(monkeypatch):
+    class _Bucket:
+        def __init__(self):
+            self.charges = 0
+
+        async def acquire(self, amount: float = 1.0):
+            self.charges += 1
+
+    class _Models:
+        def __init__(self):
+            self.calls = 0
+
+        async def generate_content(self, model, contents):
+            self.calls += 1
+            if self.calls == 1:
+                await asyncio.sleep(1)
+            return SimpleNamespace(text="ok", usage_metadata=None)
+
+    models = _Models()
+    requests, tokens = _Bucket(), _Bucket()
+    hedger = Hedger(min_samples=1, min_delay_seconds=0.01)
+    hedger.latency.record(0.01)
+    monkeypatch.setattr(
+        gemini, "client", SimpleNamespace(aio=SimpleNamespace(models=models))
+    )
+    monkeypatch.setattr(gemini, "_request_bucket", requests)
+    monkeypatch.setattr(gemini, "_token_bucket", tokens)
+    monkeypatch.setitem(gemini._hedgers, "test-model", hedger)
+
+    response = asyncio.run(gemini.generate_content_async("test-model", "prompt"))
+
+    assert response.text == "ok"
+    assert models.calls == 2
+    assert (requests.charges, tokens.charges) == (1, 1)
+
+
+def test_streamed_usage_survives_closing_from_another_context():
+    async def report_stream():
+        for text in ("first", "second"):
+            gemini._record_usage("test-model", "report", 1, 0.0)
+            yield text
+
+    collector = gemini.UsageCollector("evaluate_stream", None)
+
+    async def events():
+        async for text in gemini.iter_with_usage(report_stream(), collector):
+            yield text
+
+    async def main():
+        stream = events()
+        assert await anext(stream) == "first"
+        # An SSE disconnect closes the generator from a fresh context.
+        await asyncio.create_task(stream.aclose(), context=contextvars.Context())
+
+    asyncio.run(main())
+    assert [record.purpose for record in collector.records] == ["report"]
+    assert gemini._usage_collector.get() is None
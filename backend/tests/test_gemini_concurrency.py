@@ -0,0 +1,43 @@
+import asyncio
+import threading
+
+from app.core.gemini import ConcurrencyLimit
+
+
+def test_concurrency_limit_spans_event_loops():
+    limit = ConcurrencyLimit(3, poll_seconds=0.001)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with limit:
+            peak = max(peak, limit.in_use)
+            await asyncio.sleep(0.01)
+
+    async def calls():
+        await asyncio.gather(*(call() for _ in range(10)))
+
+    # Each thread runs its own loop, as sync callers do.
+    threads = [threading.Thread(target=asyncio.run, args=(calls(),)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == 3
+    assert limit.in_use == 0
+
+
+def test_concurrency_limit_released_on_cancel():
+    limit = ConcurrencyLimit(1, poll_seconds=0.001)
+
+    async def main():
+        async with limit:
+            waiter = asyncio.ensure_future(limit.__aenter__())
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+        assert limit.in_use == 0
+        async with limit:
+            assert limit.in_use == 1
+
+    asyncio.run(main())
@@ -0,0 +1,39 @@
+from app.domain.services.option_linker import MIN_SIMILARITY, propose_links
+
+OPTIONS = [
+    (1, "Migrate to Kubernetes. Move our services to Kubernetes to cut hosting costs."),
+    (2, "Option A (Proceed). Go ahead with the plan."),
+]
+CLAIMS = [
+    (10, "Kubernetes migration would cut hosting costs."),
+    (11, "Hosting costs will not drop after a Kubernetes migration."),
+    (12, "It is what they said it would be, and that was all."),
+    (13, "Customer churn increased in the last quarter."),
+    (14, "The database is the main bottleneck at peak load."),
+]
+ALL_PAIRS = [(o, c) for o, _ in OPTIONS for c, _ in CLAIMS]
+
+
+def _links(pending):
+    return {
+        (link["option_id"], link["claim_id"]): link
+        for link in propose_links(OPTIONS, CLAIMS, pending, MIN_SIMILARITY)
+    }
+
+
+def test_links_follow_topic_and_polarity():
+    links = _links(ALL_PAIRS)
+    assert links[(1, 10)]["effect"].value == "supports"
+    assert links[(1, 11)]["effect"].value == "weakens"
+    assert (1, 13) not in links and (1, 14) not in links
+
+
+def test_no_link_from_function_words_alone():
+    assert not any(claim_id == 12 for _, claim_id in _links(ALL_PAIRS))
+
+
+def test_only_pending_pairs_are_scored_and_scores_are_stable():
+    everything = _links(ALL_PAIRS)
+    only_one = _links([(1, 10)])
+    assert list(only_one) == [(1, 10)]
+    assert only_one[(1, 10)]["weight"] == everything[(1, 10)]["weight"]
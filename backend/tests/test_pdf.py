@@ -0,0 +1,103 @@
+import pytest
+
+from app.core.pdf import (
+    PAGE_SEPARATOR,
+    PdfExtractionTimeout,
+    PdfExtractor,
+    layout_pages,
+    page_for_offset,
+)
+
+
+def _write_pdf(path, page_texts: list[str]):
+    """A minimal PDF with one line of Helvetica text per page."""
+    n = len(page_texts)
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(n))
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {n} >>",
+    ]
+    for i, text in enumerate(page_texts):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Contents {4 + 2 * i} 0 R /Resources << /Font << /F1 "
+            f"{3 + 2 * n} 0 R >> >> >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out, offsets = "%PDF-1.4\n", []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+    out += f"startxref\n{xref}\n%%EOF\n"
+    path.write_bytes(out.encode("latin-1"))
+
+
+@pytest.fixture
+def extractor():
+    extractor = PdfExtractor(processes=1, timeout=30, memory_limit_mb=0)
+    yield extractor
+    extractor.close()
+
+
+def test_pages_stream_in_order(tmp_path, extractor):
+    path = tmp_path / "doc.pdf"
+    _write_pdf(path, ["First page", "Second page", "Third page"])
+
+    pages = extractor.iter_pages(str(path))
+    assert next(pages).strip() == "First page"
+    assert [text.strip() for text in pages] == ["Second page", "Third page"]
+
+
+def test_abandoned_stream_does_not_leak_pages(tmp_path, extractor):
+    first, second = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    _write_pdf(first, ["a1", "a2", "a3"])
+    _write_pdf(second, ["b1"])
+
+    pages = extractor.iter_pages(str(first))
+    next(pages)
+    pages.close()
+
+    assert [text.strip() for text in extractor.extract(str(second))] == ["b1"]
+
+
+def test_extractions_run_side_by_side(tmp_path, extractor):
+    first, second = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    _write_pdf(first, ["a1", "a2"])
+    _write_pdf(second, ["b1", "b2"])
+
+    # A second extraction starts while the first is still being read.
+    pages = extractor.iter_pages(str(first))
+    assert next(pages).strip() == "a1"
+    assert [text.strip() for text in extractor.extract(str(second))] == ["b1", "b2"]
+    assert [text.strip() for text in pages] == ["a2"]
+
+
+def test_child_errors_reach_the_caller(tmp_path, extractor):
+    path = tmp_path / "broken.pdf"
+    path.write_bytes(b"not a pdf")
+
+    with pytest.raises(Exception) as error:
+        extractor.extract(str(path))
+    assert not isinstance(error.value, PdfExtractionTimeout)
+
+
+def test_layout_pages_keeps_offsets():
+    content, pages = layout_pages(iter(["ab", "", "cde"]))
+
+    assert content == PAGE_SEPARATOR.join(["ab", "", "cde"])
+    for page in pages:
+        assert content[page.char_start : page.char_end] == page.text
+    starts = [page.char_start for page in pages]
+    assert [page_for_offset(starts, offset) for offset in (0, 3, 4, 6)] == [
+        1,
+        2,
+        3,
+        3,
+    ]
@@ -0,0 +1,244 @@
+"""The evaluate read path must be served by indexes on a realistic database.
+
+Runs against DATABASE_URL (Postgres) and is skipped without it. Data is
+seeded inside a transaction that is rolled back, so the database is left as
+it was found.
+"""
+
+import os
+import random
+
+import pytest
+from sqlalchemy import create_engine, event, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.compression import CODEC, compress_text, text_sha256
+from app.core.scoring import MAX_DEPTH
+from app.db.models import (
+    Claim,
+    ClaimEffect,
+    ClaimRelation,
+    ClaimType,
+    Decision,
+    DecisionClaimLink,
+    DecisionOption,
+    Document,
+    DocumentBody,
+    OptionScoreEntry,
+    RelationType,
+)
+from app.domain.repository import DecisionRepository
+from app.domain.services.option_scores import get_option_scores
+
+DATABASE_URL = os.environ.get("DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(
+    not DATABASE_URL, reason="needs DATABASE_URL pointing at Postgres"
+)
+
+# Big enough that a scan of any table below costs more than its index.
+DECISIONS = 2000
+OPTIONS_PER_DECISION = 3
+DOCUMENTS = 20000
+CLAIMS = 60000
+RELATIONS = 120000
+LINKS_PER_OPTION = 10
+
+INDEXED_TABLES = {
+    "claims",
+    "claim_relations",
+    "decision_claim_links",
+    "documents",
+    "document_bodies",
+    "option_scores",
+}
+
+
+def _insert(db: Session, model, rows: list[dict]) -> list[int]:
+    return list(db.scalars(insert(model).returning(model.id), rows))
+
+
+def _seed(db: Session, rng: random.Random):
+    decision_ids = _insert(
+        db, Decision, [{"title": f"Decision {i}"} for i in range(DECISIONS)]
+    )
+    option_ids = _insert(
+        db,
+        DecisionOption,
+        [
+            {"decision_id": decision_id, "name": f"Option {j}"}
+            for decision_id in decision_ids
+            for j in range(OPTIONS_PER_DECISION)
+        ],
+    )
+
+    doc_ids = _insert(
+        db,
+        Document,
+        [
+            {
+                "title": f"Document {i}",
+                "decision_id": rng.choice(decision_ids) if rng.random() < 0.8 else None,
+            }
+            for i in range(DOCUMENTS)
+        ],
+    )
+    db.execute(
+        insert(DocumentBody),
+        [
+            {
+                "document_id": doc_id,
+                "codec": CODEC,
+                "char_count": len(text),
+                "sha256": text_sha256(text),
+                "data": compress_text(text),
+            }
+            for doc_id, text in ((i, f"Document {i}") for i in doc_ids)
+        ],
+    )
+
+    claim_ids = _insert(
+        db,
+        Claim,
+        [
+            {
+                "text": f"Claim {i} about the decision",
+                "claim_type": rng.choice(list(ClaimType)),
+                "confidence": rng.uniform(0.3, 0.99),
+                "document_id": rng.choice(doc_ids),
+                "span_start": i,
+                "span_end": i + 1,
+            }
+            for i in range(CLAIMS)
+        ],
+    )
+
+    relations = {
+        (a, b, rng.choice(list(RelationType)))
+        for a, b in (rng.sample(claim_ids, 2) for _ in range(RELATIONS))
+    }
+    db.execute(
+        insert(ClaimRelation),
+        [
+            {
+                "from_claim_id": a,
+                "to_claim_id": b,
+                "relation_type": relation_type,
+                "strength": rng.uniform(0.1, 1.0),
+            }
+            for a, b, relation_type in relations
+        ],
+    )
+
+    db.execute(
+        insert(DecisionClaimLink),
+        [
+            {
+                "option_id": option_id,
+                "claim_id": claim_id,
+                "effect": rng.choice(list(ClaimEffect)),
+                "weight": rng.uniform(0.5, 1.5),
+            }
+            for option_id in option_ids
+            for claim_id in rng.sample(claim_ids, LINKS_PER_OPTION)
+        ],
+    )
+
+    # Every option has a stored score, so the read path below only reads.
+    db.execute(
+        insert(OptionScoreEntry),
+        [
+            {
+                "option_id": option_id,
+                "decision_id": decision_ids[i // OPTIONS_PER_DECISION],
+                "score": rng.uniform(-1.0, 1.0),
+            }
+            for i, option_id in enumerate(option_ids)
+        ],
+    )
+
+    for table in sorted(INDEXED_TABLES | {"decisions", "decision_options"}):
+        db.connection().exec_driver_sql(f"ANALYZE {table}")
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(DATABASE_URL)
+    if engine.dialect.name != "postgresql":
+        pytest.skip("query plans are checked on Postgres only")
+
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        _seed(session, random.Random(0))
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+        engine.dispose()
+
+
+def _busiest_decision(db: Session) -> int:
+    return db.scalars(
+        select(DecisionOption.decision_id)
+        .join(DecisionClaimLink, DecisionClaimLink.option_id == DecisionOption.id)
+        .group_by(DecisionOption.decision_id)
+        .order_by(func.count().desc())
+        .limit(1)
+    ).one()
+
+
+def _run_read_path(db: Session, decision_id: int):
+    repo = DecisionRepository(db)
+    graph = repo.load_decision_graph(decision_id, MAX_DEPTH)
+    get_option_scores(db, decision_id, graph.option_ids)
+
+    # The incremental score maintenance lookups.
+    claim_ids = {link.claim_id for link in graph.links}
+    repo.get_link_rows_for_options(graph.option_ids)
+    repo.get_upstream_claim_ids(claim_ids, MAX_DEPTH - 1)
+    repo.get_option_ids_linked_to(claim_ids)
+
+
+def _capture_statements(db: Session, decision_id: int) -> dict[str, object]:
+    captured = {}
+    connection = db.connection()
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        # The graph walk repeats a statement per hop; one plan each is enough.
+        captured.setdefault(statement, parameters)
+
+    event.listen(connection, "before_cursor_execute", _capture)
+    try:
+        _run_read_path(db, decision_id)
+    finally:
+        event.remove(connection, "before_cursor_execute", _capture)
+    return captured
+
+
+def _seq_scans(node: dict) -> list[str]:
+    found = []
+    if node.get("Node Type") == "Seq Scan":
+        found.append(node.get("Relation Name", "?"))
+    for child in node.get("Plans", []):
+        found.extend(_seq_scans(child))
+    return found
+
+
+def test_read_path_avoids_seq_scans(db):
+    statements = _capture_statements(db, _busiest_decision(db))
+    assert all(s.lstrip().upper().startswith("SELECT") for s in statements)
+
+    connection = db.connection()
+    scans = {}
+    for statement, parameters in statements.items():
+        plan = connection.exec_driver_sql(
+            "EXPLAIN (FORMAT JSON) " + statement, parameters
+        ).scalar()
+        tables = INDEXED_TABLES.intersection(_seq_scans(plan[0]["Plan"]))
+        if tables:
+            scans[" ".join(statement.split())[:120]] = sorted(tables)
+
+    assert scans == {}
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from app.core.resilience import CircuitBreaker, CircuitOpenError, Hedger
+
+
+def _half_open_breaker() -> CircuitBreaker:
+    breaker = CircuitBreaker(min_calls=1, open_seconds=0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    return breaker
+
+
+def test_only_one_probe_goes_through_half_open():
+    breaker = _half_open_breaker()
+
+    assert breaker.before_call() is True
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_calls_from_before_the_breaker_opened_do_not_settle_the_probe():
+    breaker = _half_open_breaker()
+    assert breaker.before_call() is True
+
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success(probe=True)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.before_call() is False
+
+
+def test_released_probe_lets_the_next_call_probe():
+    breaker = _half_open_breaker()
+    assert breaker.before_call() is True
+
+    breaker.release_probe()
+    assert breaker.before_call() is True
+
+
+def test_failed_probe_reopens():
+    breaker = _half_open_breaker()
+    assert breaker.before_call() is True
+
+    breaker.open_seconds = 60
+    breaker.record_failure(probe=True)
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_hedge_uses_its_own_call():
+    hedger = Hedger(min_samples=1, min_delay_seconds=0.01)
+    hedger.latency.record(0.01)
+    calls = []
+
+    async def slow():
+        calls.append("call")
+        await asyncio.sleep(1)
+        return "call"
+
+    async def hedge():
+        calls.append("hedge")
+        return "hedge"
+
+    assert asyncio.run(hedger.run(slow, hedge=hedge)) == "hedge"
+    assert calls == ["call", "hedge"]
+    assert hedger.hedges_won == 1
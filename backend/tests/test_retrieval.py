@@ -0,0 +1,41 @@
+from app.core.retrieval import Passage, select_passages
+
+
+def _tokens(text: str) -> int:
+    return len(text.split())
+
+
+PASSAGES = [
+    Passage(1, 1, "Kubernetes migration cuts hosting costs for the platform team."),
+    Passage(1, 2, "The cafeteria menu changes every week."),
+    Passage(2, None, "Hosting costs rose after the data centre contract renewed."),
+    Passage(2, None, "Kubernetes needs two more engineers on call."),
+    Passage(3, 4, "Office plants are watered on Fridays."),
+]
+
+
+def test_relevant_passages_win_within_budget():
+    picked = select_passages(PASSAGES, ["kubernetes hosting costs"], 20, _tokens)
+
+    assert sum(_tokens(p.text) for p in picked) <= 20
+    assert PASSAGES[0] in picked
+    assert PASSAGES[1] not in picked and PASSAGES[4] not in picked
+
+
+def test_budget_is_never_exceeded_and_order_is_kept():
+    queries = ["kubernetes", "hosting costs", "engineers on call"]
+    for budget in range(0, 40, 3):
+        picked = select_passages(PASSAGES, queries, budget, _tokens)
+        assert sum(_tokens(p.text) for p in picked) <= budget
+        assert picked == [p for p in PASSAGES if p in picked]
+
+
+def test_smaller_passage_fills_leftover_budget():
+    # The best passage does not fit; a lower ranked one that does is taken.
+    picked = select_passages(PASSAGES, ["kubernetes hosting costs"], 7, _tokens)
+    assert picked == [PASSAGES[3]]
+
+
+def test_without_matches_leading_passages_are_used():
+    picked = select_passages(PASSAGES, ["quantum"], 16, _tokens)
+    assert picked == PASSAGES[:2]
@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from app.core.scoring import EFFECT_MULTIPLIER, RELATION_MULTIPLIER, propagate
+from app.core.scoring_engine import LinkRow, RelationRow, score_decision
+
+
+def _random_graph(rng: random.Random, n_claims=60, n_options=5):
+    claims = list(range(1, n_claims + 1))
+    links = [
+        LinkRow(
+            option_id=option_id,
+            claim_id=claim_id,
+            effect=rng.choice(list(EFFECT_MULTIPLIER)),
+            weight=rng.uniform(0.5, 1.5),
+            confidence=rng.uniform(0.3, 1.0),
+            text="",
+            document_id=None,
+        )
+        for option_id in range(1, n_options + 1)
+        for claim_id in rng.sample(claims, 6)
+    ]
+    # Dense enough for cycles and for several paths into one claim.
+    relations = [
+        RelationRow(a, b, relation_type, rng.uniform(0.1, 1.0))
+        for a in claims
+        for b in rng.sample(claims, 3)
+        if a != b
+        for relation_type in [rng.choice(list(RELATION_MULTIPLIER))]
+    ]
+    return list(range(1, n_options + 1)), links, relations
+
+
+def _reference_scores(option_ids, links, relations, max_depth):
+    edges = {}
+    for r in relations:
+        edges.setdefault(r.from_claim_id, []).append(
+            (r.to_claim_id, r.relation_type, r.strength)
+        )
+
+    scores = {}
+    for option_id in option_ids:
+        seeds = {}
+        for link in links:
+            if link.option_id == option_id:
+                seeds[link.claim_id] = seeds.get(link.claim_id, 0.0) + (
+                    link.confidence * link.weight * EFFECT_MULTIPLIER[link.effect]
+                )
+        deposited = propagate(seeds, lambda c: edges.get(c, []), max_depth)
+        scores[option_id] = sum(deposited.values())
+    return scores
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("max_depth", [0, 1, 4])
+def test_propagate_all_matches_propagate(seed, max_depth):
+    option_ids, links, relations = _random_graph(random.Random(seed))
+
+    expected = _reference_scores(option_ids, links, relations, max_depth)
+    actual = score_decision(option_ids, links, relations, max_depth)
+
+    assert actual == pytest.approx(expected, abs=1e-9)
+
+
+def test_option_without_links_scores_zero():
+    option_ids, links, relations = _random_graph(random.Random(0))
+    assert score_decision(option_ids + [99], links, relations)[99] == 0.0
@@ -0,0 +1,44 @@
+from app.core.text_vectors import content_tokens, hashed_tfidf, top_k_similar
+from app.domain.services.relation_builder import MIN_SIMILARITY, propose_relations
+
+CORPUS = [
+    "The migration to Kubernetes will reduce hosting costs.",
+    "Kubernetes migration will not reduce hosting costs.",
+    "Customer churn increased in the last quarter.",
+    "The budget for the project is fixed at 200k.",
+    "Security audits are required before any production launch.",
+    "The database is the main bottleneck at peak load.",
+]
+
+
+def test_content_tokens_drop_function_words():
+    assert content_tokens("It is the plan of the board to do it") == ["plan", "board"]
+
+
+def test_function_words_alone_give_no_similarity():
+    texts = CORPUS + ["It is what it is, and that was all.", "That is not what it was."]
+    vectors = hashed_tfidf(texts)
+    pairs = list(top_k_similar(vectors, vectors, 5, 0.0, exclude_self=True))
+    assert not any({i, j} == {6, 7} for i, j, _ in pairs)
+
+
+def test_no_relation_between_sentences_sharing_only_function_words():
+    claims = list(enumerate(CORPUS)) + [
+        (10, "It is clear that all of them were there at the time."),
+        (11, "There is no way that any of it was done by then."),
+    ]
+    relations = propose_relations(claims, 5, MIN_SIMILARITY)
+    assert not any(
+        {r["from_claim_id"], r["to_claim_id"]} == {10, 11} for r in relations
+    )
+
+
+def test_restated_claims_are_related():
+    relations = propose_relations(list(enumerate(CORPUS)), 5, MIN_SIMILARITY)
+    kinds = {
+        (r["from_claim_id"], r["to_claim_id"]): r["relation_type"].value
+        for r in relations
+    }
+    assert kinds[(0, 1)] == "contradicts"
+    assert kinds[(1, 0)] == "contradicts"
+    assert all(i in (0, 1) and j in (0, 1) for i, j in kinds)
@@ -9,6 +9,7 @@ interface UploadResponse {
   filename: string;
   status: string;
   linked_to_decision: number;
+  job_id: number;
 }
 
 export const uploadDocument = async ({